@@ -1,6 +1,8 @@
 import os
 from shared_speech_utils import (
     train_model_segmented,
+    model_registry_key,
+    load_or_train_cnn_model,
     segment_and_analyze_with_output,
     live_audio_analysis
 )
@@ -11,8 +13,10 @@ if __name__ == "__main__":
     label_map = {"Felix": 0, "Linelle": 1}
     segment_length = 0.5
 
-    # Modell trainieren
-    model = train_model_segmented(audio_path, label_map, segment_length=segment_length)
+    # Modell trainieren (oder aus der Registry laden)
+    key = model_registry_key(audio_path, label_map, modell="segmented", segment_length=segment_length, sr=16000,
+                             epochs=20, batch_size=64)
+    model = load_or_train_cnn_model(key, label_map, lambda: train_model_segmented(audio_path, label_map, segment_length=segment_length))
 
     # Testdateien analysieren
     audio_files = [
@@ -0,0 +1,23 @@
+import os
+import sys
+from shared_speech_utils import (
+    train_optimized_model,
+    load_training_shards,
+    model_registry_key,
+    load_or_train_cnn_model,
+    analyze_files_parallel
+)
+
+if __name__ == "__main__":
+    # Pfad zu den Trainingsdaten
+    audio_path = os.path.join(os.path.dirname(__file__), "..", "US-Wahlkampf")
+    label_map = {"Biden": 0, "Moderator": 1, "Trump": 2}
+    num_classes = len(label_map)
+
+    # Optimiertes Modell einmal trainieren bzw. aus der Registry laden; die Worker laden es über den Schlüssel
+    model_key = model_registry_key(audio_path, label_map, modell="optuna", epochs=20, batch_size=16, n_trials=20)
+    load_or_train_cnn_model(model_key, label_map, lambda: train_optimized_model(*load_training_shards(audio_path, label_map), num_classes, n_trials=20))
+
+    # Ordner oder Glob-Muster als Argument, z. B. python Sprechererkennung_Batch.py "../US-Wahlkampf/*.mp3"
+    inputs = sys.argv[1:] or [os.path.join(audio_path, "*.mp3")]
+    analyze_files_parallel(inputs, model_key, label_map, segment_length=1, window_size=3, optimiert=True)
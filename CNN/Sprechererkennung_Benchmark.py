@@ -0,0 +1,220 @@
+import os
+import time
+import functools
+import tempfile
+import numpy as np
+import optuna
+import tensorflow as tf
+from sklearn.model_selection import train_test_split
+from shared_speech_utils import (
+    load_training_data,
+    load_training_shards,
+    make_dataset,
+    create_cnn_model,
+    objective,
+    train_optimized_model,
+    load_or_create_study,
+    train_model,
+    export_tflite_model,
+    TFLitePredictor
+)
+
+def benchmark_pruning(X, y, num_classes, n_trials=20, epochs=20, batch_size=16, seed=42):
+    """
+    Vergleicht die Optuna-Suche ohne Pruning mit dem MedianPruner aus `train_optimized_model`.
+    Beide Studien nutzen dieselbe Zielfunktion (Bericht nach jeder Epoche) und denselben Sampler-Seed
+    und liegen nur im Speicher, gespeicherte Studien bleiben unberührt.
+
+    Parameter:
+    - X (np.ndarray): Feature-Daten
+    - y (np.ndarray): Labels
+    - num_classes (int): Anzahl der Klassen
+    - n_trials (int): Trials pro Studie
+    - epochs (int): Maximale Epochen pro Trial
+    - batch_size (int): Batch-Größe
+    - seed (int): Seed des TPE-Samplers
+
+    Rückgabe:
+    - dict: Laufzeit in Sekunden, beste Validierungsgenauigkeit und Anzahl gestoppter Trials je Variante
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    objective_fn = functools.partial(objective, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                                     input_shape=(X_train.shape[1], X_train.shape[2]), num_classes=num_classes,
+                                     epochs=epochs, batch_size=batch_size)
+
+    result = {}
+    for name, pruner in [("ohne_pruning", optuna.pruners.NopPruner()),
+                         ("median_pruner", optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=5))]:
+        study = optuna.create_study(direction="maximize", sampler=optuna.samplers.TPESampler(seed=seed), pruner=pruner)
+        start = time.perf_counter()
+        study.optimize(objective_fn, n_trials=n_trials)
+        seconds = time.perf_counter() - start
+        pruned = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,)))
+        result[name] = {"seconds": seconds, "best_value": study.best_value, "pruned": pruned}
+        print(f"{name}: {seconds:.1f} s, beste Genauigkeit {study.best_value * 100:.2f}%, "
+              f"{pruned} von {n_trials} Trials gestoppt")
+    return result
+
+class _EpochTimer(tf.keras.callbacks.Callback):
+    """Misst die Dauer jeder Epoche."""
+    def on_train_begin(self, logs=None):
+        self.seconds = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.seconds.append(time.perf_counter() - self.start)
+
+def benchmark_input_pipeline(X, y, shards, num_classes, epochs=3, batch_size=16):
+    """
+    Vergleicht den Trainingsdurchsatz (Schritte pro Sekunde) von `model.fit` mit ganzen NumPy-Arrays und der
+    tf.data-Pipeline aus `make_dataset` (Merkmale im Speicher, Shards von der Platte, Shards mit Augmentierung).
+    Die erste Epoche (Graph-Aufbau) wird nicht gewertet.
+
+    Parameter:
+    - X (np.ndarray): Feature-Daten (siehe `load_training_data`)
+    - y (np.ndarray): Labels
+    - shards (np.ndarray): Shard-Pfade derselben Aufnahmen (siehe `load_training_shards`)
+    - num_classes (int): Anzahl der Klassen
+    - epochs (int): Gemessene Epochen (zusätzlich eine Aufwärm-Epoche)
+    - batch_size (int): Batch-Größe
+
+    Rückgabe:
+    - dict: Schritte pro Sekunde je Variante
+    """
+    steps = int(np.ceil(len(y) / batch_size))
+    variants = [
+        ("numpy", None),
+        ("tf.data (Speicher)", make_dataset(X, y, batch_size, shuffle_data=True)),
+        ("tf.data (Shards)", make_dataset(shards, y, batch_size, shuffle_data=True)),
+        ("tf.data (Shards + Augmentierung)", make_dataset(shards, y, batch_size, shuffle_data=True, augment=True)),
+    ]
+
+    result = {}
+    for name, dataset in variants:
+        model = create_cnn_model(X.shape[1:], num_classes)
+        timer = _EpochTimer()
+        if dataset is None:
+            model.fit(X, y, batch_size=batch_size, epochs=epochs + 1, verbose=0, callbacks=[timer])
+        else:
+            model.fit(dataset, epochs=epochs + 1, verbose=0, callbacks=[timer])
+        result[name] = steps * epochs / sum(timer.seconds[1:])
+        print(f"{name}: {result[name]:.1f} Schritte/s")
+    return result
+
+def benchmark_search(X, y, num_classes, n_trials=20, epochs=20, batch_size=16, n_workers=2):
+    """
+    Wandzeit der gesamten Suche mit `train_optimized_model` (inklusive Übernahme bzw. Neutraining des besten
+    Modells) und mittlere Dauer pro Trial für:
+    MedianPruner mit Neutraining (bisher), Hyperband mit übernommenen Gewichten (`keep_best=True`) und
+    zusätzlich `n_workers` Prozesse mit aufgeteilten Threads. Die Studien liegen in einem temporären Ordner.
+
+    Parameter:
+    - X (np.ndarray): Feature-Daten oder Shard-Pfade
+    - y (np.ndarray): Labels
+    - num_classes (int): Anzahl der Klassen
+    - n_trials (int): Trials pro Variante
+    - epochs (int): Maximale Epochen pro Trial
+    - batch_size (int): Batch-Größe
+    - n_workers (int): Prozesse der parallelen Variante
+
+    Rückgabe:
+    - dict: Gesamtzeit, Sekunden pro Trial, beste Validierungsgenauigkeit und gestoppte Trials je Variante
+    """
+    variants = [
+        ("median + Neutraining", {"pruner": "median"}),
+        ("hyperband + beste Gewichte", {"pruner": "hyperband", "keep_best": True}),
+        (f"hyperband + beste Gewichte, {n_workers} Prozesse", {"pruner": "hyperband", "keep_best": True, "n_workers": n_workers}),
+    ]
+
+    result = {}
+    with tempfile.TemporaryDirectory() as study_dir:
+        for i, (name, params) in enumerate(variants):
+            study_name = f"benchmark-{i}"
+            start = time.perf_counter()
+            train_optimized_model(X, y, num_classes, epochs=epochs, batch_size=batch_size, n_trials=n_trials,
+                                  study_name=study_name, study_dir=study_dir, **params)
+            seconds = time.perf_counter() - start
+            study = load_or_create_study(study_name, study_dir)
+            pruned = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,)))
+            result[name] = {"seconds": seconds, "seconds_per_trial": seconds / n_trials,
+                            "best_value": study.best_value, "pruned": pruned}
+            print(f"{name}: {seconds:.1f} s ({seconds / n_trials:.1f} s pro Trial), "
+                  f"beste Genauigkeit {study.best_value * 100:.2f}%, {pruned} von {n_trials} Trials gestoppt")
+    return result
+
+def _latency_ms(predict_fn, X, repeats=200):
+    # Mittlere Dauer eines Aufrufs mit einem einzelnen Segment (wie in `live_audio_analysis`) in ms
+    predict_fn(X[:1])
+    start = time.perf_counter()
+    for i in range(repeats):
+        predict_fn(X[i % len(X)][np.newaxis])
+    return (time.perf_counter() - start) / repeats * 1000
+
+def benchmark_tflite(model, X_train, X_test, y_test, batch_size=256):
+    """
+    Vergleicht die Keras-Inferenz mit dem TFLite-Export (float32 und int8 quantisiert, siehe `export_tflite_model`):
+    Latenz pro Segment (einzelne Aufrufe wie bei der Live-Analyse), Durchsatz in Batches (wie bei der
+    Dateianalyse), Genauigkeit auf den Testdaten und Übereinstimmung der Labels mit dem Keras-Modell.
+
+    Parameter:
+    - model (tf.keras.Model): Trainiertes CNN-Modell
+    - X_train (np.ndarray): Trainingsmerkmale (Kalibrierung der int8-Quantisierung)
+    - X_test, y_test (np.ndarray): Testdaten
+    - batch_size (int): Batch-Größe für den Durchsatz
+
+    Rückgabe:
+    - dict: Latenz (ms), Segmente pro Sekunde, Genauigkeit und Übereinstimmung mit Keras je Variante
+    """
+    X_batch = np.resize(X_test, (batch_size,) + X_test.shape[1:]).astype(np.float32)
+    keras_labels = np.argmax(model.predict_on_batch(X_test), axis=1)
+
+    result = {}
+    with tempfile.TemporaryDirectory() as export_dir:
+        variants = [
+            ("Keras predict", model, lambda x: model.predict(x, verbose=0)),
+            ("Keras predict_on_batch", model, model.predict_on_batch),
+        ]
+        for name, quantize in [("TFLite float32", False), ("TFLite int8", True)]:
+            path = export_tflite_model(model, os.path.join(export_dir, name.replace(" ", "_") + ".tflite"),
+                                       quantize, X_train if quantize else None)
+            predictor = TFLitePredictor(path)
+            variants.append((name, predictor, predictor.predict_on_batch))
+
+        for name, predictor, predict_fn in variants:
+            latency = _latency_ms(predict_fn, X_test)
+            predict_fn(X_batch)
+            start = time.perf_counter()
+            for _ in range(10):
+                predict_fn(X_batch)
+            throughput = 10 * batch_size / (time.perf_counter() - start)
+            labels = np.argmax(predictor.predict_on_batch(X_test), axis=1)
+            result[name] = {"latency_ms": latency, "segments_per_second": throughput,
+                            "accuracy": np.mean(labels == y_test), "agreement": np.mean(labels == keras_labels)}
+            print(f"{name}: {latency:.3f} ms pro Segment, {throughput:.0f} Segmente/s im Batch, "
+                  f"Genauigkeit {result[name]['accuracy'] * 100:.2f}%, "
+                  f"Übereinstimmung mit Keras {result[name]['agreement'] * 100:.2f}%")
+    return result
+
+if __name__ == "__main__":
+    # Pfad zu den Trainingsdaten
+    audio_path = os.path.join(os.path.dirname(__file__), "..", "US-Wahlkampf")
+    label_map = {"Biden": 0, "Moderator": 1, "Trump": 2}
+    num_classes = len(label_map)
+
+    X, y = load_training_data(audio_path, label_map)
+
+    print("\n*** Optuna-Pruning (ohne vs. MedianPruner)")
+    benchmark_pruning(X, y, num_classes)
+
+    print("\n*** Eingabe-Pipeline (NumPy vs. tf.data)")
+    shards, _ = load_training_shards(audio_path, label_map)
+    benchmark_input_pipeline(X, y, shards, num_classes)
+
+    print("\n*** Optuna-Suche (Pruner, Gewichte übernehmen, parallele Prozesse)")
+    benchmark_search(shards, y, num_classes)
+
+    print("\n*** Inferenz (Keras vs. TFLite)")
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    benchmark_tflite(train_model(X, y, label_map), X_train, X_test, y_test)
@@ -3,25 +3,43 @@ import tensorflow as tf
 from shared_speech_utils import (
     train_model,
     train_optimized_model,
-    load_training_data,
+    load_training_shards,
     segment_and_analyze_with_output,
+    model_registry_key,
+    load_or_train_cnn_model,
+    load_tflite_from_registry,
     plot
 )
 
+# True: Analyse mit den TFLite-Exporten der Modelle aus der Registry (schnellere CPU-Inferenz, siehe `TFLitePredictor`)
+USE_TFLITE = False
+
 if __name__ == "__main__":
     # Pfad zu den Trainingsdaten
     audio_path = os.path.join(os.path.dirname(__file__), "..", "US-Wahlkampf")
     label_map = {"Biden": 0, "Moderator": 1, "Trump": 2}
-
-    # Lade die Trainingsdaten
-    X, y = load_training_data(audio_path, label_map)
     num_classes = len(label_map)
 
-    # Trainiere das Standardmodell
-    model_standard = train_model(X, y, label_map)
+    # Trainingsdaten werden nur vorbereitet, wenn ein Modell neu trainiert werden muss; statt der Merkmale
+    # werden nur die Pfade der MFCC-Shards im Feature-Cache geladen (tf.data liest sie während des Trainings)
+    data = {}
+    def training_data():
+        if not data:
+            data["X"], data["y"] = load_training_shards(audio_path, label_map)
+        return data["X"], data["y"]
+
+    # Trainiere das Standardmodell (oder lade es aus der Registry)
+    key_standard = model_registry_key(audio_path, label_map, modell="standard", epochs=20, batch_size=16)
+    model_standard = load_or_train_cnn_model(key_standard, label_map, lambda: train_model(*training_data(), label_map))
+
+    # Trainiere das optimierte Modell mit Optuna (oder lade es aus der Registry)
+    key_optuna = model_registry_key(audio_path, label_map, modell="optuna", epochs=20, batch_size=16, n_trials=20)
+    model_optuna = load_or_train_cnn_model(key_optuna, label_map, lambda: train_optimized_model(*training_data(), num_classes, n_trials=20))
 
-    # Trainiere das optimierte Modell mit Optuna
-    model_optuna = train_optimized_model(X, y, num_classes, n_trials=20)
+    # TFLite-Export beim ersten Aufruf aus dem gespeicherten Keras-Modell erzeugen und danach wiederverwenden
+    if USE_TFLITE:
+        model_standard = load_tflite_from_registry(key_standard)
+        model_optuna = load_tflite_from_registry(key_optuna)
 
     # Testdatei analysieren mit beiden Modellen
     print("Teste Modelle")
@@ -1,5 +1,10 @@
 import os
-import queue
+import sys
+import time
+import hashlib
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import sounddevice as sd
 import librosa
@@ -12,9 +17,47 @@ from tensorflow.keras.layers import Input, Conv1D, MaxPooling1D, Flatten, Dense
 from sklearn.model_selection import train_test_split
 from sklearn.utils import shuffle
 
+# Gemeinsame Hilfsfunktionen von SVM und CNN liegen in speech_common.py im Projektordner
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from speech_common import (
+    stream_audio,
+    stream_windows,
+    file_hash,
+    dataset_fingerprint,
+    feature_cache_paths,
+    load_or_compute_features,
+    study_key,
+    load_or_create_study,
+    _finished_trials,
+    _optimize_stored_study,
+    iter_prediction_batches,
+    smooth_labels,
+    smooth_probabilities,
+    OnlineMajoritySmoother,
+    viterbi_decode,
+    StreamingViterbi,
+    AudioRingBuffer,
+    FileInputStream,
+    write_text_atomic,
+    resolve_audio_files
+)
+
+# TFLite-Interpreter aus LiteRT, falls installiert; `tf.lite.Interpreter` ist in TensorFlow veraltet
+try:
+    from ai_edge_litert.interpreter import Interpreter as TFLiteInterpreter
+except ImportError:
+    TFLiteInterpreter = tf.lite.Interpreter
+
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # TensorFlow Logging konfigurieren
 tf.get_logger().setLevel('ERROR')
 
+# Ablage für zwischengespeicherte MFCCs (siehe load_or_compute_features)
+FEATURE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cache", "Features")
+# Ablage der Optuna-Studien (siehe run_study)
+STUDY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cache", "Optuna")
+# Ablage für trainierte Modelle (siehe load_or_train_cnn_model)
+MODEL_REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Modelle")
+
 def extract_mfccs(audio, sr=22050, n_mfcc=13, n_fft=1024, hop_length=512, n_mels=40, max_pad_len=400):
     """
     Extrahiert MFCC-Features aus Audiodaten mit fester Länge.
@@ -39,20 +82,29 @@ def extract_mfccs(audio, sr=22050, n_mfcc=13, n_fft=1024, hop_length=512, n_mels
         mfccs = mfccs[:, :max_pad_len]
     return mfccs
 
-def load_training_data(path, label_map):
+def segment_frames(segment_length, sr=22050, hop_length=512):
     """
-    Lädt Trainingsdaten aus einem Verzeichnis mit Unterordnern, die nach den Sprechern benannt sind.
+    Berechnet die Anzahl der MFCC-Frames, die ein Segment tatsächlich erzeugt.
 
     Parameter:
-    - path (str): Pfad zum Datensatz
-    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - segment_length (float): Segmentlänge in Sekunden
+    - sr (int): Sampling-Rate
+    - hop_length (int): Schrittweite für FFT
 
     Rückgabe:
-    - Tuple[np.ndarray, np.ndarray]: Features (X) und Labels (y)
+    - int: Anzahl Frames (z. B. 0.5s bei 22050 Hz -> 22 statt 400 gepaddeter Frames)
     """
-    X = []
-    y = []
+    return 1 + int(segment_length * sr) // hop_length
+
+def model_frames(model):
+    """
+    Liefert die Frame-Anzahl, mit der ein Modell trainiert wurde. Sie steckt in der Eingabeform
+    (n_mfcc, Frames) des Modells, dadurch können Training und Inferenz nicht auseinanderlaufen.
+    """
+    return model.input_shape[-1]
 
+def _training_files(path, label_map):
+    # (Dateipfad, Label) aller Aufnahmen in den Sprecher-Unterordnern
     for speaker, label in label_map.items():
         speaker_path = os.path.join(path, speaker)
         if not os.path.exists(speaker_path):
@@ -61,16 +113,292 @@ def load_training_data(path, label_map):
 
         audio_files = [file for file in os.listdir(speaker_path) if file.endswith(".wav") or file.endswith(".mp3")]
         for file in audio_files:
-            try:
-                audio, sr = librosa.load(os.path.join(speaker_path, file), sr=22050)
-                mfccs = extract_mfccs(audio, sr)
-                X.append(mfccs)
-                y.append(label)
-            except Exception as e:
-                print(f"Fehler beim Laden von {file}: {e}")
+            yield os.path.join(speaker_path, file), label
+
+def _training_mfccs(file_path, max_pad_len, cache_dir, max_cache_mb=2048, keep=()):
+    # MFCCs einer Trainingsdatei aus dem Cache bzw. neu berechnet; liefert (mfccs, Cache-Pfad oder None)
+    def compute():
+        audio, sr = librosa.load(file_path, sr=22050)
+        return extract_mfccs(audio, sr, max_pad_len=max_pad_len), {"duration": len(audio) / sr}
+
+    params = {"typ": "mfcc", "sr": 22050, "n_mfcc": 13, "n_fft": 1024, "hop_length": 512,
+              "n_mels": 40, "max_pad_len": max_pad_len}
+    mfccs, _ = load_or_compute_features(file_path, params, compute, cache_dir, max_cache_mb, keep)
+    return mfccs, None if cache_dir is None else feature_cache_paths(file_path, params, cache_dir)[0]
+
+def _check_pinned_shards(shards, max_cache_mb):
+    # Die Shards eines Trainings müssen zusammen in den Cache passen, sonst verdrängt der nächste Schreibvorgang
+    # (auch eines anderen Prozesses) Shards, die `model.fit` noch lesen will
+    total_mb = sum(os.path.getsize(shard) for shard in shards) / 1024 ** 2
+    if total_mb > max_cache_mb:
+        raise ValueError(f"Die Trainings-Shards belegen {total_mb:.0f} MB, der Feature-Cache erlaubt nur "
+                         f"{max_cache_mb} MB. max_cache_mb erhöhen oder Merkmale im Speicher laden (cache_dir=None).")
+
+def load_training_data(path, label_map, max_pad_len=400, cache_dir=FEATURE_CACHE_DIR, max_cache_mb=2048):
+    """
+    Lädt Trainingsdaten aus einem Verzeichnis mit Unterordnern, die nach den Sprechern benannt sind.
+
+    Parameter:
+    - path (str): Pfad zum Datensatz
+    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - max_pad_len (int): Anzahl Frames pro Beispiel, z. B. `segment_frames(segment_length)`
+    - cache_dir (str): Ordner des Feature-Caches (None = ohne Cache)
+    - max_cache_mb (float): Maximale Größe des Feature-Caches
+
+    Rückgabe:
+    - Tuple[np.ndarray, np.ndarray]: Features (X) und Labels (y)
+    """
+    X = []
+    y = []
 
+    for file_path, label in _training_files(path, label_map):
+        try:
+            mfccs, _ = _training_mfccs(file_path, max_pad_len, cache_dir, max_cache_mb)
+            X.append(mfccs)
+            y.append(label)
+        except Exception as e:
+            print(f"Fehler beim Laden von {os.path.basename(file_path)}: {e}")
+
+    return np.array(X), np.array(y)
+
+def load_training_shards(path, label_map, max_pad_len=400, cache_dir=FEATURE_CACHE_DIR, max_cache_mb=2048):
+    """
+    Wie `load_training_data`, lädt aber keine Merkmale in den Speicher: jede Aufnahme wird (falls nötig)
+    einmal in den Feature-Cache geschrieben und nur der Pfad ihres `.npy`-Shards zurückgegeben.
+    Die Shards liest `make_dataset` erst während des Trainings, der Korpus darf also größer als der
+    Arbeitsspeicher sein. Beim Laden werden die Shards dieses Aufrufs nicht verdrängt; passen sie
+    zusammen nicht in `max_cache_mb`, bricht die Funktion vor dem Training mit einem ValueError ab.
+
+    Parameter:
+    - path (str): Pfad zum Datensatz
+    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - max_pad_len (int): Anzahl Frames pro Beispiel
+    - cache_dir (str): Ordner des Feature-Caches
+    - max_cache_mb (float): Maximale Größe des Feature-Caches
+
+    Rückgabe:
+    - Tuple[np.ndarray, np.ndarray]: Shard-Pfade (X) und Labels (y); beide Arrays lassen sich wie
+      Features an `train_model`, `train_optimized_model` und `train_test_split` übergeben
+    """
+    X = []
+    y = []
+
+    for file_path, label in _training_files(path, label_map):
+        try:
+            _, shard_path = _training_mfccs(file_path, max_pad_len, cache_dir, max_cache_mb, keep=X)
+            X.append(shard_path)
+            y.append(label)
+        except Exception as e:
+            print(f"Fehler beim Laden von {os.path.basename(file_path)}: {e}")
+
+    _check_pinned_shards(X, max_cache_mb)
     return np.array(X), np.array(y)
 
+def is_shard_list(X):
+    """True, wenn X Shard-Pfade (siehe `load_training_shards`) statt Merkmale enthält."""
+    return np.asarray(X).dtype.kind in ("U", "S", "O")
+
+def example_shape(X):
+    """Form eines Trainingsbeispiels, für Merkmals-Arrays und Shard-Pfade."""
+    if is_shard_list(X):
+        return tuple(np.load(X[0], mmap_mode="r").shape)
+    return tuple(X.shape[1:])
+
+def augment_mfccs(mfccs, max_time_mask=20, max_coeff_mask=2, noise_std=0.05):
+    """
+    Zufällige Augmentierung einer MFCC-Matrix (Koeffizienten x Frames) im tf.data-Graphen:
+    ein maskierter Frame-Bereich, ein maskierter Koeffizienten-Bereich (SpecAugment) und leichtes Rauschen.
+    """
+    n_coeffs, n_frames = tf.shape(mfccs)[0], tf.shape(mfccs)[1]
+
+    def band_mask(length, max_width):
+        width = tf.random.uniform([], 0, tf.minimum(max_width, length) + 1, dtype=tf.int32)
+        start = tf.random.uniform([], 0, length - width + 1, dtype=tf.int32)
+        positions = tf.range(length)
+        return tf.cast((positions < start) | (positions >= start + width), mfccs.dtype)
+
+    mfccs = mfccs * band_mask(n_frames, max_time_mask)[tf.newaxis, :] * band_mask(n_coeffs, max_coeff_mask)[:, tf.newaxis]
+    return mfccs + tf.random.normal(tf.shape(mfccs), stddev=noise_std, dtype=mfccs.dtype)
+
+def _load_shard(path):
+    return np.load(path.decode("utf-8") if isinstance(path, bytes) else path).astype(np.float32)
+
+def make_dataset(X, y, batch_size=16, shuffle_data=False, augment=False, shuffle_buffer=1024, seed=None):
+    """
+    tf.data-Pipeline für das Training: Beispiele werden (bei Shard-Pfaden parallel von der Platte) gelesen,
+    mit begrenztem Puffer gemischt, optional parallel augmentiert, gebatcht und im Voraus geladen,
+    während das Modell noch am vorherigen Batch rechnet.
+
+    Parameter:
+    - X (np.ndarray): Merkmale oder Shard-Pfade (siehe `load_training_shards`)
+    - y (np.ndarray): Labels
+    - batch_size (int): Batch-Größe
+    - shuffle_data (bool): Reihenfolge in jeder Epoche neu mischen (Training)
+    - augment (bool): `augment_mfccs` auf jedes Beispiel anwenden (Training)
+    - shuffle_buffer (int): Größe des Misch-Puffers (bei Shards werden nur die Pfade gemischt)
+    - seed (int): Seed für das Mischen
+
+    Rückgabe:
+    - tf.data.Dataset: Batches aus (Merkmale, Labels)
+    """
+    y = np.asarray(y)
+    if is_shard_list(X):
+        shape = example_shape(X)
+        dataset = tf.data.Dataset.from_tensor_slices((np.asarray(X).astype(str), y))
+        if shuffle_data:
+            dataset = dataset.shuffle(min(shuffle_buffer, len(y)), seed=seed, reshuffle_each_iteration=True)
+
+        def load(path, label):
+            features = tf.numpy_function(_load_shard, [path], tf.float32)
+            features.set_shape(shape)
+            return features, label
+
+        dataset = dataset.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        # Merkmale liegen schon im Speicher
+        dataset = tf.data.Dataset.from_tensor_slices((np.asarray(X, dtype=np.float32), y))
+        if shuffle_data:
+            dataset = dataset.shuffle(min(shuffle_buffer, len(y)), seed=seed, reshuffle_each_iteration=True)
+
+    if augment:
+        dataset = dataset.map(lambda features, label: (augment_mfccs(features), label), num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+def _segment_mfccs(file_path, segment_length, sr, hop_seconds, cache_dir, max_cache_mb=2048, keep=()):
+    # MFCCs aller Segmentfenster einer Aufnahme (Fenster x Koeffizienten x Frames), genau wie bei der Inferenz:
+    # gestreamt dekodiert, in Sample-Fenster von `segment_length` geschnitten und pro Fenster `extract_mfccs`;
+    # liefert (mfccs, Cache-Pfad oder None)
+    frames = segment_frames(segment_length, sr)
+    segment_samples = int(segment_length * sr)
+    hop_samples = max(1, int(hop_seconds * sr))
+
+    def compute():
+        windows = [extract_mfccs(segment, sr, max_pad_len=frames)
+                   for segment in stream_windows(stream_audio(file_path, sr), segment_samples, hop_samples)]
+        mfccs = np.stack(windows) if windows else np.empty((0, 13, frames), dtype=np.float32)
+        return mfccs, {"windows": len(windows)}
+
+    params = {"typ": "mfcc_segmente", "sr": sr, "n_mfcc": 13, "n_fft": 1024, "hop_length": 512, "n_mels": 40,
+              "segment_samples": segment_samples, "hop_samples": hop_samples}
+    mfccs, _ = load_or_compute_features(file_path, params, compute, cache_dir, max_cache_mb, keep)
+    return mfccs, None if cache_dir is None else feature_cache_paths(file_path, params, cache_dir)[0]
+
+def _load_segment_sources(files, segment_length, sr, hop_seconds, cache_dir, max_cache_mb=2048, pinned=None):
+    # Segment-MFCCs für eine Liste von (Dateipfad, Label); mit Cache nur die Shard-Pfade. Die Shards werden
+    # in `pinned` gesammelt und beim Verdrängen ausgelassen (auch über mehrere Aufrufe eines Trainings)
+    pinned = [] if pinned is None else pinned
+    sources = []
+    y = []
+
+    for file_path, label in files:
+        try:
+            mfccs, shard_path = _segment_mfccs(file_path, segment_length, sr, hop_seconds, cache_dir, max_cache_mb, pinned)
+            if shard_path is not None:
+                pinned.append(shard_path)
+            sources.append(mfccs if shard_path is None else shard_path)
+            y.append(label)
+        except Exception as e:
+            print(f"Fehler beim Laden von {os.path.basename(file_path)}: {e}")
+
+    if cache_dir is None:
+        in_memory = np.empty(len(sources), dtype=object)
+        in_memory[:] = sources
+        return in_memory, np.array(y)
+    _check_pinned_shards(pinned, max_cache_mb)
+    return np.array(sources), np.array(y)
+
+def load_segmented_training_data(path, label_map, segment_length=0.5, sr=16000, hop_seconds=None, cache_dir=FEATURE_CACHE_DIR,
+                                 max_cache_mb=2048):
+    """
+    Lädt pro Aufnahme alle Segmentfenster statt eines auf 400 Frames abgeschnittenen Beispiels. Die Fenster
+    entstehen wie bei der Inferenz (`stream_segment_predictions`): Sample-Fenster von `segment_length` Sekunden,
+    für jedes einzeln `extract_mfccs`. Pro Aufnahme wird ein Array (Fenster, 13, Frames) im Feature-Cache abgelegt.
+
+    Parameter:
+    - path (str): Pfad zum Datensatz
+    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - segment_length (float): Segmentlänge in Sekunden, wie bei der Inferenz
+    - sr (int): Sampling-Rate, wie bei der Inferenz
+    - hop_seconds (float): Abstand der Fenster in Sekunden (Standard: `segment_length`, ohne Überlappung)
+    - cache_dir (str): Ordner des Feature-Caches; mit Cache werden nur die Shard-Pfade geliefert,
+      ohne Cache (None) die Arrays im Speicher
+    - max_cache_mb (float): Maximale Größe des Feature-Caches; die Shards dieses Aufrufs werden nicht verdrängt,
+      passen sie zusammen nicht hinein, gibt es vor dem Training einen ValueError
+
+    Rückgabe:
+    - Tuple[np.ndarray, np.ndarray]: Quellen pro Aufnahme (Shard-Pfade oder Arrays der Fenster) und Labels
+    """
+    return _load_segment_sources(list(_training_files(path, label_map)), segment_length, sr,
+                                 hop_seconds or segment_length, cache_dir, max_cache_mb)
+
+def _source_windows(source):
+    return len(np.load(source, mmap_mode="r") if isinstance(source, str) else source)
+
+def segment_index(sources):
+    """
+    Index aller Segmentfenster über die Quellen (siehe `load_segmented_training_data`).
+
+    Rückgabe:
+    - Tuple[np.ndarray, np.ndarray]: Index der Quelle und Index des Fensters innerhalb der Quelle
+    """
+    counts = [_source_windows(source) for source in sources]
+    source_ids = np.repeat(np.arange(len(sources)), counts)
+    window_ids = np.concatenate([np.arange(count) for count in counts]) if counts else np.empty(0, dtype=int)
+    return source_ids, window_ids
+
+def _load_window(path, index):
+    return np.array(np.load(path.decode("utf-8") if isinstance(path, bytes) else path, mmap_mode="r")[index], dtype=np.float32)
+
+def make_segment_dataset(sources, y, frames, batch_size=64, shuffle_data=False, augment=False, shuffle_buffer=10000, seed=None):
+    """
+    tf.data-Pipeline aus Segmentfenstern: jedes Beispiel ist ein Fenster (13, frames) einer Aufnahme.
+    Bei Shards werden nur (Pfad, Fensterindex)-Paare gemischt, das Fenster wird erst beim Lesen aus der
+    Memory-Map des Shards geholt; der Korpus muss also nicht in den Arbeitsspeicher passen.
+
+    Parameter:
+    - sources (np.ndarray): Shard-Pfade oder Arrays der Fenster (siehe `load_segmented_training_data`)
+    - y (np.ndarray): Label pro Quelle
+    - frames (int): Frames pro Fenster, `segment_frames(segment_length, sr)`
+    - batch_size (int): Batch-Größe
+    - shuffle_data (bool): Fenster in jeder Epoche neu mischen (Training)
+    - augment (bool): `augment_mfccs` auf jedes Fenster anwenden (Training)
+    - shuffle_buffer (int): Größe des Misch-Puffers
+    - seed (int): Seed für das Mischen
+
+    Rückgabe:
+    - tf.data.Dataset: Batches aus (Fenster (13, frames), Labels)
+    """
+    y = np.asarray(y)
+    source_ids, window_ids = segment_index(sources)
+    window_labels = y[source_ids]
+    n_coeffs = 13
+
+    if len(sources) and isinstance(sources[0], str):
+        paths = np.asarray(sources).astype(str)
+        dataset = tf.data.Dataset.from_tensor_slices((paths[source_ids], window_ids, window_labels))
+        if shuffle_data:
+            dataset = dataset.shuffle(min(shuffle_buffer, len(window_ids)), seed=seed, reshuffle_each_iteration=True)
+
+        def load(path, index, label):
+            window = tf.numpy_function(_load_window, [path, index], tf.float32)
+            window.set_shape((n_coeffs, frames))
+            return window, label
+
+        dataset = dataset.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        # Fenster liegen schon im Speicher
+        windows = np.concatenate([np.asarray(source, dtype=np.float32) for source in sources]) if len(sources) \
+            else np.empty((0, n_coeffs, frames), dtype=np.float32)
+        dataset = tf.data.Dataset.from_tensor_slices((windows, window_labels))
+        if shuffle_data:
+            dataset = dataset.shuffle(min(shuffle_buffer, len(window_ids)), seed=seed, reshuffle_each_iteration=True)
+
+    if augment:
+        max_time_mask = max(1, frames // 5)
+        dataset = dataset.map(lambda window, label: (augment_mfccs(window, max_time_mask=max_time_mask), label),
+                              num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
 def create_cnn_model(input_shape, num_classes):
     """
     Erstellt ein CNN-Modell für die Sprachklassifikation.
@@ -134,89 +462,433 @@ def create_optimized_cnn(trial, input_shape, num_classes):
     model.compile(optimizer=optimizer, loss="sparse_categorical_crossentropy", metrics=["accuracy"])
     return model
 
-def objective(trial, X_train, y_train, X_test, y_test, input_shape, num_classes, epochs=20, batch_size=16):
+class OptunaPruningCallback(tf.keras.callbacks.Callback):
+    """
+    Meldet nach jeder Epoche die Validierungsgenauigkeit an den Optuna-Trial und bricht das Training ab,
+    sobald der Pruner der Studie den Trial für aussichtslos hält.
+    """
+    def __init__(self, trial, monitor="val_accuracy"):
+        super().__init__()
+        self.trial = trial
+        self.monitor = monitor
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is None:
+            return
+        self.trial.report(float(value), epoch)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Trial {self.trial.number} nach Epoche {epoch + 1} gestoppt.")
+
+def objective(trial, X_train, y_train, X_test, y_test, input_shape, num_classes, epochs=20, batch_size=16, augment=False,
+              weights_dir=None):
     """
     Bewertet ein CNN-Modell mit verschiedenen Hyperparametern und gibt die Accuracy zurück.
+    Die Validierungsgenauigkeit wird pro Epoche gemeldet (siehe `OptunaPruningCallback`), schlechte
+    Trials werden so vor Ablauf aller Epochen abgebrochen. Vor jedem Trial wird der Keras-Zustand
+    zurückgesetzt, damit der Speicher über viele Trials nicht wächst.
 
     Parameter:
     - trial (optuna.trial.Trial): Optuna Trial-Objekt
-    - X_train, y_train, X_test, y_test: Trainings- und Testdaten
+    - X_train, y_train, X_test, y_test: Trainings- und Testdaten (Merkmale oder Shard-Pfade, siehe `make_dataset`)
     - input_shape (tuple): Form der Eingabedaten
     - num_classes (int): Anzahl der Klassen
     - epochs (int): Anzahl der Trainings-Epochen
     - batch_size (int): Batch-Größe für das Training
+    - augment (bool): Trainingsbeispiele zufällig augmentieren (siehe `augment_mfccs`)
+    - weights_dir (str): Ordner, in dem die Gewichte und die History jedes vollständigen Trials abgelegt
+      werden (User-Attribute "weights" und "history"), None = nichts speichern
 
     Rückgabe:
     - float: Testgenauigkeit des trainierten Modells
     """
+    tf.keras.backend.clear_session()
+    train_data = make_dataset(X_train, y_train, batch_size, shuffle_data=True, augment=augment)
+    val_data = make_dataset(X_test, y_test, batch_size)
     model = create_optimized_cnn(trial, input_shape, num_classes)
-    model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, validation_data=(X_test, y_test), verbose=0)
-    _, accuracy = model.evaluate(X_test, y_test, verbose=0)
+    history = model.fit(train_data, epochs=epochs, validation_data=val_data, verbose=0, callbacks=[OptunaPruningCallback(trial)])
+    _, accuracy = model.evaluate(val_data, verbose=0)
+
+    if weights_dir is not None:
+        os.makedirs(weights_dir, exist_ok=True)
+        weights_path = os.path.join(weights_dir, f"trial_{trial.number}.weights.h5")
+        model.save_weights(weights_path)
+        trial.set_user_attr("weights", weights_path)
+        trial.set_user_attr("history", {name: [float(value) for value in values] for name, values in history.history.items()})
     return accuracy
 
-def train_optimized_model(X, y, num_classes, epochs=20, batch_size=16, n_trials=50):
+def _init_search_worker(threads_per_worker):
+    # Kerne zwischen den Such-Prozessen aufteilen (vor der ersten TensorFlow-Operation im Prozess)
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_worker)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def run_study(study_name, objective_fn, n_trials, study_dir=STUDY_DIR, n_workers=1, n_jobs=1, pruner=None, initial_params=None,
+              threads_per_worker=None):
+    """
+    Setzt eine gespeicherte Studie fort, bis sie `n_trials` abgeschlossene (oder gestoppte) Trials hat.
+    Ist sie schon vollständig, wird nichts gerechnet und die Studie mit ihrem besten Trial zurückgegeben.
+
+    Parameter:
+    - study_name (str): Name der Studie, z. B. aus `study_key`
+    - objective_fn: Zielfunktion mit dem Trial als einzigem Argument (bei n_workers > 1 picklebar, z. B. functools.partial)
+    - n_trials (int): Gesamtzahl der Trials der Studie (über alle Läufe und Worker)
+    - study_dir (str): Ordner des Storage
+    - n_workers (int): Anzahl Prozesse, die gemeinsam an der Studie arbeiten
+    - n_jobs (int): Threads pro Prozess
+    - pruner: Optuna-Pruner
+    - initial_params (dict): Startwerte für den ersten Trial einer neuen Studie
+    - threads_per_worker (int): TensorFlow-Threads je Worker-Prozess bei n_workers > 1
+      (Standard: Kerne / n_workers, damit sich die Prozesse die Kerne nicht gegenseitig wegnehmen)
+
+    Rückgabe:
+    - optuna.Study: Die (fortgesetzte) Studie
+    """
+    study = load_or_create_study(study_name, study_dir, pruner, initial_params)
+    finished = _finished_trials(study)
+    remaining = n_trials - finished
+    if remaining <= 0:
+        print(f"Studie {study_name} ist vollständig ({finished} Trials), beste Parameter werden wiederverwendet.")
+        return study
+
+    print(f"Studie {study_name}: {finished} von {n_trials} Trials vorhanden, {remaining} werden gerechnet.")
+    if n_workers == 1:
+        _optimize_stored_study(study_name, study_dir, objective_fn, n_trials, remaining, n_jobs, pruner)
+    else:
+        # Frische Prozesse ("spawn"), damit die Thread-Anzahl vor der Initialisierung von TensorFlow gesetzt wird
+        threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // n_workers)
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_search_worker, initargs=(threads_per_worker,)) as executor:
+            futures = [executor.submit(_optimize_stored_study, study_name, study_dir, objective_fn, n_trials, remaining,
+                                       n_jobs, pruner) for _ in range(n_workers)]
+            for future in futures:
+                future.result()
+    return load_or_create_study(study_name, study_dir, pruner)
+
+def search_pruner(name="median", epochs=20):
+    """
+    Optuna-Pruner für die CNN-Suche, Ressource ist die Epoche.
+
+    Parameter:
+    - name (str): "median" (MedianPruner nach 5 vollständigen Trials und 5 Epochen Aufwärmphase),
+      "halving" (Successive Halving: nach 1, 3, 9, ... Epochen läuft nur das beste Drittel weiter) oder
+      "hyperband" (mehrere Successive-Halving-Klammern mit unterschiedlicher Mindest-Epochenzahl)
+    - epochs (int): Maximale Epochen pro Trial
+
+    Rückgabe:
+    - optuna.pruners.BasePruner: Der Pruner
+    """
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=5)
+    if name == "halving":
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=1, reduction_factor=3)
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=epochs, reduction_factor=3)
+    raise ValueError(f"Unbekannter Pruner: {name}")
+
+def _best_trial_model(study, input_shape, num_classes):
+    # Modell des besten Trials mit dessen gespeicherten Gewichten, None wenn keine Gewichte vorliegen
+    weights_path = study.best_trial.user_attrs.get("weights")
+    if weights_path is None or not os.path.exists(weights_path):
+        return None
+    model = create_optimized_cnn(optuna.trial.FixedTrial(study.best_params), input_shape, num_classes)
+    model.load_weights(weights_path)
+    return model
+
+def _remove_trial_weights(study, keep):
+    # Gewichte aller Trials außer `keep` löschen
+    for trial in study.get_trials(deepcopy=False):
+        weights_path = trial.user_attrs.get("weights")
+        if weights_path not in (None, keep) and os.path.exists(weights_path):
+            os.remove(weights_path)
+
+def train_optimized_model(X, y, num_classes, epochs=20, batch_size=16, n_trials=50, n_workers=1, study_name=None, study_dir=STUDY_DIR,
+                          pruner=None, augment=False, keep_best=False, threads_per_worker=None):
     """
     Optimiert die Hyperparameter mit Optuna und trainiert das beste Modell.
 
     Parameter:
-    - X (np.ndarray): Feature-Daten
+    - X (np.ndarray): Feature-Daten oder Shard-Pfade (siehe `load_training_shards`)
     - y (np.ndarray): Labels
     - num_classes (int): Anzahl der Klassen
     - epochs (int): Anzahl der Trainings-Epochen
     - batch_size (int): Batch-Größe
-    - n_trials (int): Anzahl der Optuna-Optimierungsversuche
+    - n_trials (int): Gesamtzahl der Optuna-Optimierungsversuche. Die Studie wird gespeichert (siehe `run_study`),
+      ein erneuter Lauf rechnet nur die fehlenden Trials
+    - n_workers (int): Anzahl Prozesse, die gemeinsam an der Studie arbeiten
+    - study_name (str): Name der Studie (Standard: aus Daten, Epochen und Batch-Größe, siehe `study_key`)
+    - study_dir (str): Ordner des Optuna-Storage
+    - pruner: Optuna-Pruner für den Abbruch schlechter Trials nach einzelnen Epochen oder ein Name für
+      `search_pruner` ("median", "halving", "hyperband"); Standard: "median"
+    - augment (bool): Trainingsbeispiele zufällig augmentieren (siehe `augment_mfccs`)
+    - keep_best (bool): Die Gewichte jedes Trials speichern und das Modell des besten Trials direkt übernehmen,
+      statt die besten Parameter erneut zu trainieren. Gewichte der übrigen Trials werden danach gelöscht
+    - threads_per_worker (int): TensorFlow-Threads je Worker-Prozess bei n_workers > 1 (siehe `run_study`)
 
     Rückgabe:
     - tf.keras.Model: Das beste trainierte CNN-Modell
     """
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    input_shape = (X_train.shape[1], X_train.shape[2])
-
-    study = optuna.create_study(direction="maximize")
-    study.optimize(lambda trial: objective(trial, X_train, y_train, X_test, y_test, input_shape, num_classes, epochs, batch_size), n_trials=n_trials)
+    input_shape = example_shape(X_train)
+
+    # Gespeicherte Studie fortsetzen bzw. anlegen
+    if study_name is None:
+        data_hash = hashlib.sha1(np.ascontiguousarray(X).tobytes() + np.ascontiguousarray(y).tobytes()).hexdigest()
+        study_name = study_key("cnn", data=data_hash, num_classes=num_classes, epochs=epochs, batch_size=batch_size,
+                               **({"augment": True} if augment else {}))
+    weights_dir = os.path.join(study_dir, "Gewichte", study_name) if keep_best else None
+    objective_fn = functools.partial(objective, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
+                                     input_shape=input_shape, num_classes=num_classes, epochs=epochs, batch_size=batch_size,
+                                     augment=augment, weights_dir=weights_dir)
+    if pruner is None or isinstance(pruner, str):
+        pruner = search_pruner(pruner or "median", epochs)
+    study = run_study(study_name, objective_fn, n_trials, study_dir, n_workers=n_workers, pruner=pruner,
+                      threads_per_worker=threads_per_worker)
 
     best_params = study.best_params
     print("Beste Hyperparameter:", best_params)
 
+    if keep_best:
+        best_model = _best_trial_model(study, input_shape, num_classes)
+        if best_model is not None:
+            # Modell des besten Trials übernehmen, kein erneutes Training
+            _remove_trial_weights(study, keep=study.best_trial.user_attrs["weights"])
+            save_history(study.best_trial.user_attrs["history"], "CNN/Ausgaben/history_optuna.json")
+            return best_model
+        print("Keine gespeicherten Gewichte für den besten Trial, die besten Parameter werden neu trainiert.")
+
     # Trainiere das beste Modell erneut mit den besten Parametern
     best_model = create_optimized_cnn(optuna.trial.FixedTrial(best_params), input_shape, num_classes)
-    history = best_model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, validation_data=(X_test, y_test), verbose=1)
+    history = best_model.fit(make_dataset(X_train, y_train, batch_size, shuffle_data=True, augment=augment), epochs=epochs,
+                             validation_data=make_dataset(X_test, y_test, batch_size), verbose=1)
 
     # Modell speichern
     save_history(history, "CNN/Ausgaben/history_optuna.json")
 
     return best_model
 
-def train_model(X, y, label_map, epochs=20, batch_size=16):
+def train_model(X, y, label_map, epochs=20, batch_size=16, augment=False):
     """
     Trainiert ein CNN-Modell mit segmentierten Trainingsdaten.
 
     Parameter:
-    - audio_path (str): Pfad zum Datensatz
+    - X (np.ndarray): Feature-Daten oder Shard-Pfade (siehe `load_training_shards`)
+    - y (np.ndarray): Labels
     - label_map (dict): Mapping von Sprechernamen zu Labels
-    - sr (int): Sampling-Rate
     - epochs (int): Anzahl der Trainings-Epochen
     - batch_size (int): Batch-Größe für das Training
+    - augment (bool): Trainingsbeispiele zufällig augmentieren (siehe `augment_mfccs`)
 
     Rückgabe:
     - tf.keras.Model: Trainiertes CNN-Modell
     """
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    # Modell erstellen und trainieren
-    input_shape = (X_train.shape[1], X_train.shape[2])
+    # Modell erstellen und trainieren (Daten über die tf.data-Pipeline, siehe `make_dataset`)
+    input_shape = example_shape(X_train)
     model = create_cnn_model(input_shape, num_classes=len(label_map))
-    history = model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, validation_data=(X_test, y_test), verbose=1)
+    history = model.fit(make_dataset(X_train, y_train, batch_size, shuffle_data=True, augment=augment), epochs=epochs,
+                        validation_data=make_dataset(X_test, y_test, batch_size), verbose=1)
 
     # Modell speichern
     save_history(history, "CNN/Ausgaben/history_standard.json")
 
     return model
 
+def train_model_segmented(audio_path, label_map, segment_length=0.5, sr=16000, hop_seconds=None, epochs=20, batch_size=64,
+                          augment=False, cache_dir=FEATURE_CACHE_DIR, max_cache_mb=2048):
+    """
+    Trainiert ein CNN auf Segmenten derselben Länge wie bei der Inferenz statt auf einem abgeschnittenen
+    Beispiel pro Datei. Die Trainingsfenster entstehen wie bei der Inferenz (siehe `load_segmented_training_data`),
+    die Eingabebreite des Modells ist die tatsächliche Frame-Anzahl eines Segments (`segment_frames`,
+    z. B. 16 statt 400 Frames für 0.5s bei 16 kHz); `model_frames` liest sie bei der Inferenz wieder aus.
+
+    Parameter:
+    - audio_path (str): Pfad zum Datensatz
+    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - segment_length (float): Segmentlänge in Sekunden, wie bei `segment_and_analyze_with_output`
+    - sr (int): Sampling-Rate, wie bei der Inferenz
+    - hop_seconds (float): Abstand der Trainingsfenster in Sekunden (Standard: halbe Segmentlänge, also 50% Überlappung);
+      validiert wird immer mit Fenstern ohne Überlappung wie bei der Inferenz
+    - epochs (int): Anzahl der Trainings-Epochen
+    - batch_size (int): Batch-Größe
+    - augment (bool): Trainingsfenster zufällig augmentieren (siehe `augment_mfccs`)
+    - cache_dir (str): Ordner des Feature-Caches (None = Merkmale im Speicher)
+    - max_cache_mb (float): Maximale Größe des Feature-Caches (siehe `load_segmented_training_data`)
+
+    Rückgabe:
+    - tf.keras.Model: Trainiertes CNN-Modell
+    """
+    frames = segment_frames(segment_length, sr)
+
+    # Nach Aufnahmen aufteilen, damit sich Trainings- und Validierungsfenster nicht überlappen
+    files = list(_training_files(audio_path, label_map))
+    files_train, files_test = train_test_split(files, test_size=0.2, random_state=42)
+    pinned = []
+    sources_train, y_train = _load_segment_sources(files_train, segment_length, sr, hop_seconds or segment_length / 2, cache_dir,
+                                                   max_cache_mb, pinned)
+    sources_test, y_test = _load_segment_sources(files_test, segment_length, sr, segment_length, cache_dir, max_cache_mb, pinned)
+    train_data = make_segment_dataset(sources_train, y_train, frames, batch_size, shuffle_data=True, augment=augment)
+    val_data = make_segment_dataset(sources_test, y_test, frames, batch_size)
+
+    model = create_cnn_model((13, frames), num_classes=len(label_map))
+    history = model.fit(train_data, epochs=epochs, validation_data=val_data, verbose=1)
+
+    # Modell speichern
+    save_history(history, "CNN/Ausgaben/history_segmented.json")
+
+    return model
+
+def model_registry_key(path, label_map, **params):
+    """
+    Erzeugt den Registry-Schlüssel aus Datensatz-Fingerabdruck, label_map und Trainingsparametern.
+
+    Parameter:
+    - path (str): Pfad zum Datensatz
+    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - params: Alle Parameter, die das Modell beeinflussen (z. B. modell="optuna", epochs, n_trials)
+
+    Rückgabe:
+    - str: Schlüssel für `load_or_train_cnn_model`
+    """
+    key_params = {"dataset": dataset_fingerprint(path, label_map), "label_map": label_map, "params": params}
+    return hashlib.sha1(json.dumps(key_params, sort_keys=True).encode("utf-8")).hexdigest()
+
+def save_model_to_registry(model, key, label_map, registry_dir=MODEL_REGISTRY_DIR):
+    """
+    Speichert ein Keras-Modell im `.keras`-Format zusammen mit label_map und Feature-Länge.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    model_path = os.path.join(registry_dir, key + ".keras")
+    model.save(model_path)
+    with open(os.path.join(registry_dir, key + ".json"), 'w') as f:
+        json.dump({"label_map": label_map, "max_pad_len": model_frames(model)}, f)
+    print(f"Modell gespeichert: {model_path}")
+
+def load_model_from_registry(key, registry_dir=MODEL_REGISTRY_DIR):
+    """
+    Lädt ein Keras-Modell aus der Registry. Gibt None zurück, wenn es keinen Eintrag für `key` gibt.
+    """
+    model_path = os.path.join(registry_dir, key + ".keras")
+    if not (os.path.exists(model_path) and os.path.exists(os.path.join(registry_dir, key + ".json"))):
+        return None
+    return tf.keras.models.load_model(model_path)
+
+def load_or_train_cnn_model(key, label_map, train_fn, registry_dir=MODEL_REGISTRY_DIR):
+    """
+    Lädt ein passendes Modell aus der Registry oder trainiert es mit `train_fn` und speichert es.
+
+    Parameter:
+    - key (str): Schlüssel aus `model_registry_key`
+    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - train_fn: Funktion ohne Argumente, die ein trainiertes Modell zurückgibt
+    - registry_dir (str): Ordner der Registry
+
+    Rückgabe:
+    - tf.keras.Model: Geladenes oder neu trainiertes Modell
+    """
+    model = load_model_from_registry(key, registry_dir)
+    if model is not None:
+        print("Modell aus der Registry geladen.")
+        return model
+
+    model = train_fn()
+    save_model_to_registry(model, key, label_map, registry_dir)
+    return model
+
+def export_tflite_model(model, path, quantize=False, representative_data=None):
+    """
+    Exportiert ein Keras-CNN (`create_cnn_model` / `create_optimized_cnn`) als TFLite-Modell für die
+    schnelle CPU-Inferenz mit `TFLitePredictor`.
+
+    Parameter:
+    - model (tf.keras.Model): Trainiertes CNN-Modell
+    - path (str): Zieldatei (.tflite)
+    - quantize (bool): int8-Quantisierung nach dem Training. Mit `representative_data` werden Gewichte und
+      Aktivierungen quantisiert (Ein- und Ausgabe bleiben float32), ohne sie nur die Gewichte
+    - representative_data (np.ndarray): Beispiel-Merkmale (z. B. Trainingsbeispiele) zur Kalibrierung der
+      Aktivierungsbereiche, höchstens 200 werden verwendet
+
+    Rückgabe:
+    - str: Pfad der geschriebenen Datei
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if representative_data is not None:
+            def representative_dataset():
+                for example in np.asarray(representative_data[:200], dtype=np.float32):
+                    yield [example[np.newaxis]]
+
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+class TFLitePredictor:
+    """
+    Schlanker Ersatz für ein Keras-Modell bei der Inferenz: bietet `predict`, `predict_on_batch` und
+    `input_shape`, kann also direkt an `segment_and_analyze_with_output`, `stream_segment_predictions` und
+    `live_audio_analysis` übergeben werden. Ein Aufruf läuft ohne den Keras-Overhead direkt durch den
+    TFLite-Interpreter (auf der CPU mit XNNPACK, dem Standard-Delegate für float-Modelle). Verwendet wird
+    der Interpreter aus `ai_edge_litert`, falls installiert, sonst `tf.lite.Interpreter`.
+    """
+    def __init__(self, model_path, num_threads=None):
+        """
+        Parameter:
+        - model_path (str): TFLite-Datei aus `export_tflite_model`
+        - num_threads (int): Threads des Interpreters (Standard: TensorFlow-Vorgabe)
+        """
+        self.model_path = model_path
+        self.interpreter = TFLiteInterpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output_index = self.interpreter.get_output_details()[0]["index"]
+        self._batch_size = int(self._input["shape"][0])
+
+    @property
+    def input_shape(self):
+        return (None,) + tuple(int(dim) for dim in self._input["shape"][1:])
+
+    def predict_on_batch(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) != self._batch_size:
+            # Tensoren nur neu anlegen, wenn sich die Batch-Größe ändert
+            self.interpreter.resize_tensor_input(self._input["index"], x.shape)
+            self.interpreter.allocate_tensors()
+            self._batch_size = len(x)
+        self.interpreter.set_tensor(self._input["index"], x)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output_index).copy()
+
+    def predict(self, x, verbose=0):
+        return self.predict_on_batch(x)
+
+def load_tflite_from_registry(key, registry_dir=MODEL_REGISTRY_DIR, quantize=False, representative_data=None, num_threads=None):
+    """
+    `TFLitePredictor` für ein Modell aus der Registry. Die TFLite-Datei wird beim ersten Aufruf aus dem
+    Keras-Modell exportiert und neben ihm abgelegt. Der Dateiname enthält die Quantisierung
+    (siehe `export_tflite_model`): `<key>.tflite`, `<key>_dynamic.tflite` (nur Gewichte, ohne
+    `representative_data`) bzw. `<key>_int8.tflite` (Gewichte und Aktivierungen).
+    Gibt None zurück, wenn es keinen Eintrag für `key` gibt.
+    """
+    suffix = ("_int8" if representative_data is not None else "_dynamic") if quantize else ""
+    tflite_path = os.path.join(registry_dir, key + suffix + ".tflite")
+    if not os.path.exists(tflite_path):
+        model = load_model_from_registry(key, registry_dir)
+        if model is None:
+            return None
+        export_tflite_model(model, tflite_path, quantize, representative_data)
+    return TFLitePredictor(tflite_path, num_threads)
+
 def save_history(history, filename):
+    # History-Objekt von `model.fit` oder bereits ein dict (z. B. aus den User-Attributen eines Trials)
     with open(filename, 'w') as f:
-        json.dump(history.history, f)
+        json.dump(getattr(history, "history", history), f)
 
 def load_history(filename):
     with open(filename, 'r') as f:
@@ -253,47 +925,79 @@ def plot():
     plt.savefig("CNN/Ausgaben/plt_vergleich.png")
     plt.show()
 
-def segment_and_analyze_with_output(audio_file, model, label_map, segment_length=0.1, window_size=3, sr=16000, optimiert=False):
+def stream_segment_predictions(audio_file, model, segment_length=0.1, sr=16000, batch_size=256, max_batch_mb=64, block_seconds=10):
+    """
+    Dekodiert, segmentiert und klassifiziert eine Audiodatei als Strom: Die Datei wird blockweise gelesen
+    (`stream_audio`) und die Softmax-Ausgaben werden Batch für Batch geliefert, während der Rest der Datei
+    noch dekodiert wird. Der Speicherbedarf hängt nicht von der Länge der Datei ab.
+
+    Parameter:
+    - audio_file (str): Pfad zur Audiodatei
+    - model (tf.keras.Model | TFLitePredictor): Trainiertes CNN-Modell
+    - segment_length (float): Länge jedes Segments in Sekunden (Segmente ohne Überlappung)
+    - sr (int): Sampling-Rate
+    - batch_size (int): Anzahl Segmente, die gemeinsam klassifiziert werden
+    - max_batch_mb (float): Speichergrenze für einen Batch in MB
+    - block_seconds (float): Länge eines dekodierten Blocks in Sekunden
+
+    Rückgabe:
+    - Generator über (Startzeit in Sekunden, Softmax-Ausgabe) pro Segment
+    """
+    segment_samples = int(segment_length * sr)
+    max_pad_len = model_frames(model)
+    segments = stream_windows(stream_audio(audio_file, sr, block_seconds), segment_samples, segment_samples)
+    segment_features = (extract_mfccs(segment, sr, max_pad_len=max_pad_len) for segment in segments)
+
+    index = 0
+    for batch in iter_prediction_batches(model.predict_on_batch, segment_features, batch_size, max_batch_mb):
+        for prediction in batch:
+            yield index * segment_length, prediction
+            index += 1
+
+def segment_and_analyze_with_output(audio_file, model, label_map, segment_length=0.1, window_size=3, sr=16000, optimiert=False,
+                                    batch_size=256, max_batch_mb=64, smoothing="majority", switch_prob=0.1):
     """
     Führt Sprechererkennung auf einer Audiodatei durch und segmentiert die Ergebnisse.
     Die Ergebnisse werden in eine Datei geschrieben, die denselben Namen wie die Eingabedatei trägt.
 
     Parameter:
     - audio_file (str): Pfad zur Audiodatei
-    - model (tf.keras.Model): Trainiertes CNN-Modell
+    - model (tf.keras.Model | TFLitePredictor): Trainiertes CNN-Modell
     - label_map (dict): Mapping von Sprechernamen zu Labels
     - segment_length (float): Länge jedes Segments in Sekunden
     - window_size (int): Fenstergröße für die Glättung der Vorhersagen
     - sr (int): Sampling-Rate
+    - optimiert (bool): Ob das Optuna-Modell verwendet wird (nur für den Dateinamen)
+    - batch_size (int): Anzahl Segmente, die gemeinsam klassifiziert werden
+    - max_batch_mb (float): Speichergrenze für einen Batch in MB
+    - smoothing (str): "majority", "median" (siehe `smooth_labels`), "probability"
+      (Mittelung der Softmax-Ausgaben, siehe `smooth_probabilities`) oder "viterbi" (siehe `viterbi_decode`)
+    - switch_prob (float): Wechselwahrscheinlichkeit zwischen zwei Segmenten für "viterbi"
+
+    Rückgabe:
+    - str: Pfad der geschriebenen Ausgabedatei
     """
     label_to_name = {v: k for k, v in label_map.items()}
 
     if not os.path.isfile(audio_file):
         raise FileNotFoundError(f"Die Datei {audio_file} existiert nicht.")
 
-    audio, _ = librosa.load(audio_file, sr=sr)
-    segment_samples = int(segment_length * sr)
-    num_segments = len(audio) // segment_samples
-
-    original_results = []
-    for i in range(num_segments):
-        start = i * segment_samples
-        end = start + segment_samples
-        segment = audio[start:end]
-        mfccs = extract_mfccs(segment, sr)
-        mfccs = np.expand_dims(mfccs, axis=0)
-        prediction = model.predict(mfccs, verbose=0)
-        original_results.append(np.argmax(prediction, axis=1)[0])
-
-    # Glättung der Vorhersagen
-    padding = (window_size - 1) // 2
-    padded_results = [None] * padding + original_results + [None] * padding
-    cleaned_results = []
-
-    for i in range(len(original_results)):
-        window = padded_results[i - padding:i + padding]
-        window = [label for label in window if label is not None]
-        cleaned_results.append(max(set(window), key=window.count) if window else None)
+    # Datei als Strom dekodieren und klassifizieren (ein predict-Aufruf pro Batch statt pro Segment);
+    # gesammelt werden nur die Vorhersagen, nicht das Audio
+    predictions = np.array([prediction for _, prediction in
+                            stream_segment_predictions(audio_file, model, segment_length, sr, batch_size, max_batch_mb)])
+    num_segments = len(predictions)
+
+    # Glättung der Vorhersagen (zentriertes Fenster, vektorisiert)
+    if len(predictions) == 0:
+        cleaned_results = []
+    elif smoothing == "probability":
+        cleaned_results = smooth_probabilities(predictions, window_size)
+    elif smoothing == "viterbi":
+        cleaned_results = viterbi_decode(predictions, switch_prob)
+    else:
+        cleaned_results = smooth_labels(np.argmax(predictions, axis=1), window_size, method=smoothing,
+                                        num_classes=predictions.shape[1])
 
     current_speaker = None
     segment_start_time = 0
@@ -310,41 +1014,117 @@ def segment_and_analyze_with_output(audio_file, model, label_map, segment_length
     else:
         modelname = "standard"
     output_file_name = os.path.join("CNN", "Ausgaben", os.path.splitext(os.path.basename(audio_file))[0] + "_" + modelname + "_" + str(window_size) + ".txt")
-    with open(output_file_name, 'w') as output_file:
-        for i, speaker in enumerate(cleaned_results):
-            speaker_name = label_to_name.get(speaker, "Unbekannt")
-            if speaker_name != current_speaker:
-                if current_speaker is not None:
-                    end_time = i * segment_length
-                    output_file.write(f"[{format_time(segment_start_time)} - {format_time(end_time)}] {current_speaker}\n")
-                current_speaker = speaker_name
-                segment_start_time = i * segment_length
-
-        if current_speaker is not None:
-            end_time = num_segments * segment_length
-            output_file.write(f"[{format_time(segment_start_time)} - {format_time(end_time)}] {current_speaker}\n")
-
-def live_audio_analysis(model, label_map, segment_length=0.1, sr=16000, window_size=3):
+    lines = []
+    for i, speaker in enumerate(cleaned_results):
+        speaker_name = label_to_name.get(speaker, "Unbekannt")
+        if speaker_name != current_speaker:
+            if current_speaker is not None:
+                end_time = i * segment_length
+                lines.append(f"[{format_time(segment_start_time)} - {format_time(end_time)}] {current_speaker}\n")
+            current_speaker = speaker_name
+            segment_start_time = i * segment_length
+
+    if current_speaker is not None:
+        end_time = num_segments * segment_length
+        lines.append(f"[{format_time(segment_start_time)} - {format_time(end_time)}] {current_speaker}\n")
+
+    os.makedirs(os.path.dirname(output_file_name), exist_ok=True)
+    write_text_atomic(output_file_name, "".join(lines))
+    return output_file_name
+
+# Modell pro Worker-Prozess, wird einmal in `_init_batch_worker` geladen
+_batch_model = None
+
+def _init_batch_worker(model_key, registry_dir, threads_per_worker):
+    global _batch_model
+    # Kerne zwischen den Workern aufteilen statt jeden Prozess alle Kerne belegen zu lassen
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_worker)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _batch_model = load_model_from_registry(model_key, registry_dir)
+    if _batch_model is None:
+        raise FileNotFoundError(f"Kein Modell mit dem Schlüssel {model_key} in {registry_dir}.")
+
+def _analyze_file_in_worker(audio_file, label_map, analyze_kwargs):
+    start = time.perf_counter()
+    output_file = segment_and_analyze_with_output(audio_file, _batch_model, label_map, **analyze_kwargs)
+    return {"file": audio_file, "duration": librosa.get_duration(path=audio_file),
+            "seconds": time.perf_counter() - start, "output": output_file}
+
+def analyze_files_parallel(inputs, model_key, label_map, n_workers=None, registry_dir=MODEL_REGISTRY_DIR, **analyze_kwargs):
+    """
+    Analysiert viele Aufnahmen parallel mit `segment_and_analyze_with_output` (eine Datei pro Aufgabe).
+
+    Jeder Worker-Prozess (gestartet mit "spawn", damit TensorFlow sauber initialisiert wird) lädt das Modell
+    einmal aus der Registry; die Ausgaben unter CNN/Ausgaben werden atomar geschrieben. Pro Datei wird der
+    Echtzeitfaktor (Rechenzeit / Audiodauer) ausgegeben, am Ende der Gesamtdurchsatz.
+
+    Parameter:
+    - inputs (str | list): Ordner, Glob-Muster (z. B. "US-Wahlkampf/*.mp3") oder Liste davon
+    - model_key (str): Registry-Schlüssel des Modells (siehe `model_registry_key`)
+    - label_map (dict): Mapping von Sprechernamen zu Labels
+    - n_workers (int): Anzahl Worker-Prozesse (Standard: alle Kerne, höchstens eine pro Datei)
+    - registry_dir (str): Ordner der Registry
+    - analyze_kwargs: Weitere Parameter für `segment_and_analyze_with_output` (z. B. segment_length, window_size)
+
+    Rückgabe:
+    - list: Ein Bericht pro Datei (file, duration, seconds, output) in Eingabereihenfolge
+    """
+    files = resolve_audio_files(inputs)
+    if not files:
+        print("Keine Audiodateien gefunden.")
+        return []
+    n_workers = min(n_workers or os.cpu_count() or 1, len(files))
+    threads_per_worker = max(1, (os.cpu_count() or 1) // n_workers)
+
+    print(f"Analysiere {len(files)} Dateien mit {n_workers} Prozessen")
+    start = time.perf_counter()
+    reports = {}
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_batch_worker, initargs=(model_key, registry_dir, threads_per_worker)) as executor:
+        futures = [executor.submit(_analyze_file_in_worker, file, label_map, analyze_kwargs) for file in files]
+        for done, future in enumerate(as_completed(futures), start=1):
+            report = future.result()
+            reports[report["file"]] = report
+            print(f"[{done}/{len(files)}] {os.path.basename(report['file'])}: {report['duration']:.1f}s Audio in "
+                  f"{report['seconds']:.1f}s (Echtzeitfaktor {report['seconds'] / max(report['duration'], 1e-9):.3f})")
+    elapsed = time.perf_counter() - start
+
+    total_audio = sum(report["duration"] for report in reports.values())
+    print(f"Gesamt: {total_audio:.1f}s Audio in {elapsed:.1f}s "
+          f"({total_audio / elapsed:.1f}s Audio pro Sekunde, {len(files) / elapsed:.2f} Dateien/s)")
+    return [reports[file] for file in files]
+
+def live_audio_analysis(model, label_map, segment_length=0.1, sr=16000, window_size=3, input_stream=None, buffer_seconds=10,
+                        smoothing="majority", lag=5, switch_prob=0.1):
     """
     Führt eine Live-Sprechererkennung durch und glättet die Ergebnisse.
 
     Parameter:
-    - model (tf.keras.Model): Das trainierte CNN-Modell
+    - model (tf.keras.Model | TFLitePredictor): Das trainierte CNN-Modell
     - label_map (dict): Mapping von Sprechernamen zu Labels
     - segment_length (float): Länge der Segmente in Sekunden
     - sr (int): Sampling-Rate
     - window_size (int): Fenstergröße für die Glättung der Ergebnisse
+    - input_stream: Fabrik mit der Signatur von `sd.InputStream` (Standard: Mikrofon), z. B. `FileInputStream`
+    - buffer_seconds (float): Kapazität des Ringpuffers in Sekunden
+    - smoothing (str): "majority" (`OnlineMajoritySmoother`) oder "viterbi" (`StreamingViterbi` auf den Softmax-Ausgaben)
+    - lag (int): Verzögerung in Segmenten, nach der "viterbi" ein Label festlegt
+    - switch_prob (float): Wechselwahrscheinlichkeit zwischen zwei Segmenten für "viterbi"
     """
-    buffer = queue.Queue()
     label_to_name = {v: k for k, v in label_map.items()}
     segment_samples = int(segment_length * sr)
-    current_audio = np.zeros(0, dtype=np.float32)
+    max_pad_len = model_frames(model)
+    ring = AudioRingBuffer(max(int(buffer_seconds * sr), 2 * segment_samples))
+    segment = np.zeros(segment_samples, dtype=np.float32)  # wird für jedes Segment wiederverwendet
+
+    if input_stream is None:
+        input_stream = sd.InputStream
 
     def callback(indata, frames, time, status):
         if status:
             print(status)
-        # Aufgenommene Audiodaten in den Puffer speichern
-        buffer.put(indata[:, 0])
+        # Aufgenommene Audiodaten direkt in den Ringpuffer kopieren
+        ring.write(indata[:, 0])
 
     def format_time(seconds):
         """Hilfsfunktion, um Sekunden in mm:ss:msms-Format zu formatieren."""
@@ -353,54 +1133,47 @@ def live_audio_analysis(model, label_map, segment_length=0.1, sr=16000, window_s
         ms = int((seconds % 1) * 1000)
         return f"{m:02}:{s:02}:{ms:03}"
 
-    with sd.InputStream(samplerate=sr, channels=1, callback=callback, blocksize=segment_samples):
+    with input_stream(samplerate=sr, channels=1, callback=callback, blocksize=segment_samples) as stream:
         print("Live-Sprechererkennung gestartet. Drücke STRG+C, um zu beenden.")
 
         try:
-            original_results = []
+            if smoothing == "viterbi":
+                smoother = StreamingViterbi(len(label_map), lag, switch_prob)
+            else:
+                smoother = OnlineMajoritySmoother(window_size)
             start_time = 0
 
-            while True:
-                # Daten aus dem Puffer lesen und in den aktuellen Audio-Stream einfügen
-                while not buffer.empty():
-                    current_audio = np.append(current_audio, buffer.get())
+            def print_smoothed(index, label):
+                smoothed_start = index * segment_length
+                speaker_name = label_to_name.get(label, "Unbekannt")
+                print(f"Glättung [{format_time(smoothed_start)} - {format_time(smoothed_start + segment_length)}]: {speaker_name}")
 
-                # Verarbeitung in segmentierten Blöcken
-                while len(current_audio) >= segment_samples:
-                    segment = current_audio[:segment_samples]
-                    current_audio = current_audio[segment_samples:]
-                    
+            while stream.active or ring.available() >= segment_samples:
+                # Verarbeitung in segmentierten Blöcken fester Länge
+                while ring.read_into(segment):
                     # MFCCs extrahieren und vorhersagen
-                    mfccs = extract_mfccs(segment, sr)
+                    mfccs = extract_mfccs(segment, sr, max_pad_len=max_pad_len)
                     mfccs = np.expand_dims(mfccs, axis=0)
-                    prediction = model.predict(mfccs, verbose=0)
+                    prediction = np.asarray(model.predict_on_batch(mfccs))
                     predicted_label = np.argmax(prediction, axis=1)[0]
-                    original_results.append(predicted_label)
 
                     # Ausgabe des aktuellen Segments
                     speaker_name = label_to_name.get(predicted_label, "Unbekannt")
                     print(f"[{format_time(start_time)} - {format_time(start_time + segment_length)}] {speaker_name}")
                     start_time += segment_length
 
-                # Ergebnisse glätten und anzeigen (alle x Sekunden)
-                if len(original_results) >= window_size:
-                    smoothed_results = []
-                    padding = (window_size - 1) // 2
-                    padded_results = [None] * padding + original_results + [None] * padding
-
-                    for i in range(len(original_results)):
-                        window = padded_results[i:i + window_size]
-                        window = [label for label in window if label is not None]
-                        most_common = max(set(window), key=window.count) if window else None
-                        smoothed_results.append(most_common)
-
-                    # Letzte geglättete Ergebnisse ausgeben
-                    if smoothed_results:
-                        speaker_name = label_to_name.get(smoothed_results[-1], "Unbekannt")
-                        print(f"Glättung: {speaker_name}")
+                    # Inkrementell glätten: nur das Fenster der letzten Segmente wird betrachtet
+                    smoothed = smoother.push(prediction[0] if smoothing == "viterbi" else predicted_label)
+                    if smoothed is not None:
+                        print_smoothed(*smoothed)
 
                 # Wartezeit für Live-Streaming
-                sd.sleep(int(segment_length * 1000))
+                time.sleep(segment_length)
+
+            # Letzte Segmente mit abgeschnittenem Fenster ausgeben
+            for index, label in smoother.flush():
+                print_smoothed(index, label)
+            print("Eingabestrom beendet.")
 
         except KeyboardInterrupt:
             print("Erkennung beendet.")
\ No newline at end of file
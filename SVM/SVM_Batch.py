@@ -0,0 +1,20 @@
+import os, sys
+from SVM_shared_utils import (
+    train_svm_model_optuna,
+    train_or_load_svm_model,
+    svm_registry_key,
+    analyze_files_parallel
+)
+
+if __name__ == "__main__":
+    audio_path = os.path.join(os.path.dirname(__file__), "..", "US-Wahlkampf")
+    label_map = {"Biden": 0, "Moderator": 1, "Trump": 2}
+    segment_length=0.5
+
+    # Modell einmal trainieren bzw. aus der Registry laden; die Worker laden es über den Schlüssel
+    train_or_load_svm_model(audio_path,"Optuna",label_map,segment_length,train_fn=train_svm_model_optuna)
+    model_key = svm_registry_key(audio_path,"Optuna",label_map,segment_length,train_fn=train_svm_model_optuna)
+
+    # Ordner oder Glob-Muster als Argument, z. B. python SVM_Batch.py "../US-Wahlkampf/*.mp3"
+    inputs = sys.argv[1:] or [os.path.join(audio_path, "*.mp3")]
+    analyze_files_parallel(inputs, model_key, label_map, segment_length=0.25, sr=16000)
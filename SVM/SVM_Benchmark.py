@@ -0,0 +1,323 @@
+import os, time, functools, warnings
+import numpy as np, optuna
+from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from sklearn.utils import shuffle
+from SVM_shared_utils import (
+    load_data,
+    build_svm_pipeline,
+    predict_batch,
+    smooth_labels,
+    OnlineMajoritySmoother,
+    smooth_with_hmm,
+    labels_to_posteriors,
+    viterbi_decode,
+    objective,
+    suggest_svm_pipeline,
+    benchmark_resource_plans,
+    svm_backend_pipeline,
+    SVM_BACKENDS
+)
+
+def benchmark_inference_artifact(X, y, n_repeats=3):
+    """
+    Vergleicht den alten Inferenzweg (äußerer StandardScaler + Pipeline mit eigenem Scaler)
+    mit dem neuen Artefakt (eine Pipeline, ein Scaler) und prüft, dass die Vorhersagen gleich bleiben.
+
+    Eingabeparameter:
+    - X (numpy.array): Merkmale.
+    - y (numpy.array): Labels.
+    - n_repeats (int): Anzahl Wiederholungen der Zeitmessung.
+
+    Ausgabe:
+    - dict: Übereinstimmung der Vorhersagen und Zeit pro Segment (alt, neu, neu gebatcht) in Millisekunden.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    # Alter Weg: doppelte Skalierung
+    outer_scaler = StandardScaler()
+    old_model = build_svm_pipeline(SVC(kernel="rbf", class_weight='balanced'))
+    old_model.fit(outer_scaler.fit_transform(X_train), y_train)
+
+    # Neuer Weg: eine Pipeline
+    new_model = build_svm_pipeline(SVC(kernel="rbf", class_weight='balanced'))
+    new_model.fit(X_train, y_train)
+
+    def per_segment_ms(predict):
+        best = float("inf")
+        for _ in range(n_repeats):
+            start = time.perf_counter()
+            for features in X_test:
+                predict(features)
+            best = min(best, time.perf_counter() - start)
+        return best / len(X_test) * 1000
+
+    old_pred = old_model.predict(outer_scaler.transform(X_test))
+    new_pred = predict_batch(new_model, X_test)
+
+    start = time.perf_counter()
+    predict_batch(new_model, X_test)
+    batch_ms = (time.perf_counter() - start) / len(X_test) * 1000
+
+    result = {
+        "agreement": float(np.mean(old_pred == new_pred)),
+        "old_ms": per_segment_ms(lambda f: old_model.predict(outer_scaler.transform([f]))),
+        "new_ms": per_segment_ms(lambda f: new_model.predict([f])),
+        "batch_ms": batch_ms,
+    }
+    print(f"Übereinstimmung der Vorhersagen: {result['agreement'] * 100:.2f}%")
+    print(f"Zeit pro Segment alt: {result['old_ms']:.3f} ms, neu: {result['new_ms']:.3f} ms, "
+          f"neu mit predict_batch: {result['batch_ms']:.3f} ms")
+    assert result["agreement"] == 1.0, "Altes und neues Inferenz-Artefakt sagen unterschiedlich vorher."
+    return result
+
+def _smooth_loop(labels, window_size):
+    """Bisherige schleifenbasierte Mehrheitsglättung (zentriertes Fenster) als Referenz."""
+    smoothed = []
+    for i in range(len(labels)):
+        window = list(labels[max(0, i - (window_size - 1) // 2):i + window_size // 2 + 1])
+        smoothed.append(min(set(window), key=lambda label: (-window.count(label), label)))
+    return np.array(smoothed)
+
+def benchmark_smoothing(n_segments=20000, num_classes=3, window_size=5, seed=0):
+    """
+    Vergleicht die schleifenbasierte Mehrheitsglättung mit der vektorisierten `smooth_labels`
+    und prüft, dass beide dieselben Labels liefern.
+
+    Eingabeparameter:
+    - n_segments (int): Anzahl simulierter Segment-Vorhersagen.
+    - num_classes (int): Anzahl Sprecher.
+    - window_size (int): Fenstergröße der Glättung.
+    - seed (int): Seed für die simulierten Vorhersagen.
+
+    Ausgabe:
+    - dict: Übereinstimmung und Laufzeit (Schleife, vektorisiert) in Millisekunden.
+    """
+    labels = np.random.default_rng(seed).integers(0, num_classes, n_segments)
+
+    start = time.perf_counter()
+    loop_result = _smooth_loop(labels, window_size)
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    vectorized_result = smooth_labels(labels, window_size, num_classes=num_classes)
+    vectorized_ms = (time.perf_counter() - start) * 1000
+
+    result = {
+        "agreement": float(np.mean(loop_result == vectorized_result)),
+        "loop_ms": loop_ms,
+        "vectorized_ms": vectorized_ms,
+    }
+    print(f"Übereinstimmung der Glättung: {result['agreement'] * 100:.2f}%")
+    print(f"{n_segments} Segmente: Schleife {loop_ms:.1f} ms, vektorisiert {vectorized_ms:.1f} ms")
+    return result
+
+def check_live_smoothing(n_segments=2000, num_classes=3, window_sizes=range(1, 9), seed=0):
+    """
+    Prüft, dass die Live-Glättung (`OnlineMajoritySmoother`, Segment für Segment) für gerade und ungerade
+    Fenstergrößen dieselben Labels liefert wie die Dateiglättung (`smooth_labels`).
+
+    Eingabeparameter:
+    - n_segments (int): Anzahl simulierter Segment-Vorhersagen.
+    - num_classes (int): Anzahl Sprecher.
+    - window_sizes: Zu prüfende Fenstergrößen.
+    - seed (int): Seed für die simulierten Vorhersagen.
+
+    Ausgabe:
+    - dict: Übereinstimmung pro Fenstergröße; AssertionError bei einer Abweichung.
+    """
+    labels = np.random.default_rng(seed).integers(0, num_classes, n_segments)
+
+    result = {}
+    for window_size in window_sizes:
+        smoother = OnlineMajoritySmoother(window_size)
+        live = [smoother.push(label) for label in labels]
+        live = dict([item for item in live if item is not None] + smoother.flush())
+        live_labels = np.array([live[i] for i in range(n_segments)])
+        result[window_size] = float(np.mean(live_labels == smooth_labels(labels, window_size, num_classes=num_classes)))
+        print(f"Fenster {window_size}: Übereinstimmung Live/Datei {result[window_size] * 100:.2f}%")
+    assert all(agreement == 1.0 for agreement in result.values()), "Live- und Dateiglättung weichen voneinander ab."
+    return result
+
+def _smooth_with_gaussian_hmm(predictions, num_classes):
+    """Bisherige Glättung: GaussianHMM per EM auf den Labels anpassen und dekodieren (Referenz)."""
+    from hmmlearn import hmm
+
+    model = hmm.GaussianHMM(n_components=num_classes, covariance_type="diag", n_iter=100, init_params='', random_state=42)
+    model.startprob_ = np.full(num_classes, 1.0 / num_classes)
+    model.transmat_ = np.full((num_classes, num_classes), 0.1 / (num_classes - 1))
+    np.fill_diagonal(model.transmat_, 0.9)
+    model.means_ = np.arange(num_classes, dtype=float).reshape(-1, 1)
+    model.covars_ = np.ones((num_classes, 1))
+    reshaped = predictions.reshape(-1, 1)
+    model.fit(reshaped)
+    return model.predict(reshaped)
+
+def benchmark_hmm_smoothing(n_segments=5000, num_classes=3, turn_length=50, error_rate=0.3, seed=0):
+    """
+    Vergleicht die bisherige HMM-Glättung (GaussianHMM mit EM, hmmlearn) mit `viterbi_decode`
+    auf simulierten Sprecherwechseln mit verrauschten Vorhersagen.
+
+    Eingabeparameter:
+    - n_segments (int): Anzahl Segmente.
+    - num_classes (int): Anzahl Sprecher.
+    - turn_length (int): Segmente pro Sprecherbeitrag.
+    - error_rate (float): Anteil zufällig verfälschter Vorhersagen.
+    - seed (int): Seed der Simulation.
+
+    Ausgabe:
+    - dict: Genauigkeit gegenüber der wahren Sprecherfolge und Laufzeit in Millisekunden.
+    """
+    rng = np.random.default_rng(seed)
+    truth = np.repeat(rng.integers(0, num_classes, n_segments // turn_length + 1), turn_length)[:n_segments]
+    noisy = np.where(rng.random(n_segments) < error_rate, rng.integers(0, num_classes, n_segments), truth)
+
+    # Simulierte Wahrscheinlichkeiten: das vorhergesagte Label ist am wahrscheinlichsten
+    posteriors = 0.5 * labels_to_posteriors(noisy, num_classes, 0.8) + 0.5 * rng.dirichlet(np.ones(num_classes), n_segments)
+
+    result = {"raw_accuracy": float(np.mean(noisy == truth))}
+    for name, smooth in [("hmmlearn", lambda: _smooth_with_gaussian_hmm(noisy, num_classes)),
+                         ("viterbi_labels", lambda: smooth_with_hmm(noisy, num_classes)),
+                         ("viterbi_posteriors", lambda: viterbi_decode(posteriors))]:
+        start = time.perf_counter()
+        smoothed = smooth()
+        result[name + "_ms"] = (time.perf_counter() - start) * 1000
+        result[name + "_accuracy"] = float(np.mean(smoothed == truth))
+        print(f"{name}: Genauigkeit {result[name + '_accuracy'] * 100:.2f}%, {result[name + '_ms']:.1f} ms")
+    print(f"Ungeglättet: Genauigkeit {result['raw_accuracy'] * 100:.2f}%")
+    return result
+
+def benchmark_pruning(X, y, n_trials=30, seed=42):
+    """
+    Vergleicht die Optuna-Suche ohne Pruning mit dem MedianPruner aus `train_svm_model_optuna`.
+    Beide Studien nutzen dieselbe Zielfunktion (Bericht nach jedem CV-Fold) und denselben Sampler-Seed
+    und liegen nur im Speicher, gespeicherte Studien bleiben unberührt.
+
+    Eingabeparameter:
+    - X (numpy.array): Merkmale.
+    - y (numpy.array): Labels.
+    - n_trials (int): Trials pro Studie.
+    - seed (int): Seed des TPE-Samplers.
+
+    Ausgabe:
+    - dict: Laufzeit in Sekunden, beste Kreuzvalidierungsgenauigkeit und Anzahl gestoppter Trials je Variante.
+    """
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    objective_fn = functools.partial(objective, X_train=X_train, y_train=y_train)
+
+    result = {}
+    for name, pruner in [("ohne_pruning", optuna.pruners.NopPruner()),
+                         ("median_pruner", optuna.pruners.MedianPruner(n_startup_trials=5, interval_steps=2))]:
+        study = optuna.create_study(direction="maximize", sampler=optuna.samplers.TPESampler(seed=seed), pruner=pruner)
+        start = time.perf_counter()
+        study.optimize(objective_fn, n_trials=n_trials)
+        seconds = time.perf_counter() - start
+        pruned = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,)))
+        result[name] = {"seconds": seconds, "best_value": study.best_value, "pruned": pruned}
+        print(f"{name}: {seconds:.1f} s, beste Genauigkeit {study.best_value * 100:.2f}%, "
+              f"{pruned} von {n_trials} Trials gestoppt")
+    return result
+
+def benchmark_probability_tuning(X, y, n_configs=5, seed=42):
+    """
+    Misst, was `probability=True` während der Suche kostet: dieselben zufällig gezogenen SVM-Konfigurationen
+    werden per 5-facher Kreuzvalidierung mit und ohne interne Platt-Kalibrierung bewertet.
+
+    Eingabeparameter:
+    - X (numpy.array): Merkmale.
+    - y (numpy.array): Labels.
+    - n_configs (int): Anzahl Konfigurationen aus dem Optuna-Suchraum.
+    - seed (int): Seed für die Konfigurationen.
+
+    Ausgabe:
+    - dict: Laufzeit in Sekunden und mittlere CV-Genauigkeit mit und ohne probability sowie der Speedup.
+    """
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    models = []
+    study = optuna.create_study(direction="maximize", sampler=optuna.samplers.RandomSampler(seed=seed))
+    study.optimize(lambda trial: models.append(suggest_svm_pipeline(trial)) or 0.0, n_trials=n_configs)
+
+    result = {}
+    for name, probability in [("mit_probability", True), ("ohne_probability", False)]:
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)  # probability ist ab scikit-learn 1.9 veraltet
+            scores = [cross_val_score(model.set_params(svm__probability=probability), X_train, y_train,
+                                      cv=StratifiedKFold(n_splits=5)).mean() for model in models]
+        result[name] = {"seconds": time.perf_counter() - start, "accuracy": float(np.mean(scores))}
+    result["speedup"] = result["mit_probability"]["seconds"] / result["ohne_probability"]["seconds"]
+    for name in ("mit_probability", "ohne_probability"):
+        print(f"{name}: {result[name]['seconds']:.1f} s, mittlere CV-Genauigkeit {result[name]['accuracy'] * 100:.2f}%")
+    print(f"Speedup der Suche ohne probability: {result['speedup']:.1f}x")
+    return result
+
+def benchmark_backends(X, y, backends=SVM_BACKENDS, n_latency=200):
+    """
+    Vergleicht die Klassifikator-Backends (siehe `svm_backend_pipeline`) mit Standardparametern auf demselben
+    Train/Test-Split: Trainingszeit, Vorhersagelatenz und Testgenauigkeit.
+
+    Eingabeparameter:
+    - X (numpy.array): Merkmale.
+    - y (numpy.array): Labels.
+    - backends (tuple): Zu vergleichende Backends.
+    - n_latency (int): Anzahl Einzelsegmente für die Latenzmessung.
+
+    Ausgabe:
+    - dict: Pro Backend Trainingszeit (s), Latenz pro Einzelsegment und pro Segment im Batch (ms) und Genauigkeit.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    result = {}
+    for backend in backends:
+        model = svm_backend_pipeline(backend)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for features in X_test[:n_latency]:
+            model.predict(features[np.newaxis])
+        single_ms = (time.perf_counter() - start) / min(n_latency, len(X_test)) * 1000
+
+        start = time.perf_counter()
+        y_pred = predict_batch(model, X_test)
+        batch_ms = (time.perf_counter() - start) / len(X_test) * 1000
+
+        result[backend] = {"fit_s": fit_s, "single_ms": single_ms, "batch_ms": batch_ms,
+                           "accuracy": float(np.mean(y_pred == y_test))}
+        print(f"{backend}: Training {fit_s:.2f} s, Einzelsegment {single_ms:.3f} ms, im Batch {batch_ms:.4f} ms, "
+              f"Genauigkeit {result[backend]['accuracy'] * 100:.2f}%")
+    return result
+
+if __name__ == "__main__":
+    print("\n*** Glättung (Schleife vs. vektorisiert)")
+    benchmark_smoothing()
+
+    print("\n*** Glättung (Live vs. Datei)")
+    check_live_smoothing()
+
+    print("\n*** HMM-Glättung (hmmlearn vs. Viterbi)")
+    benchmark_hmm_smoothing()
+
+    audio_path = os.path.join(os.path.dirname(__file__), "..", "Stimmen")
+    label_map = {"Felix": 0, "Linelle": 1, "Paul": 2}
+    segment_length = 0.5
+
+    X, y = load_data(audio_path, label_map, segment_length)
+    X, y = shuffle(X, y, random_state=42)
+
+    print("\n*** Inferenz-Artefakt (einfache vs. doppelte Skalierung)")
+    benchmark_inference_artifact(X, y)
+
+    print("\n*** Optuna-Pruning (ohne vs. MedianPruner)")
+    benchmark_pruning(X, y)
+
+    print("\n*** Aufteilung der Kerne (Trials x Folds x BLAS-Threads)")
+    benchmark_resource_plans(X, y)
+
+    print("\n*** Tuning mit und ohne probability=True")
+    benchmark_probability_tuning(X, y)
+
+    print("\n*** Klassifikator-Backends (SVC vs. linear skalierende Backends)")
+    benchmark_backends(X, y)
@@ -1,6 +1,8 @@
 import os
 from SVM_shared_utils import(
     train_svm_model_optuna,
+    train_or_load_svm_model,
+    AudioHandle,
     segment_and_analyze_with_svm,
     plot_speaker_timeline,
     live_audio_analysis_svm,
@@ -12,20 +14,23 @@ if __name__ == "__main__":
     audio_path = os.path.join(os.path.dirname(__file__), "..", "Stimmen")
     label_map = {"Felix": 0, "Linelle": 1, "Paul": 2}
     segment_length=0.5
-    model ,scaler,methode= train_svm_model_optuna(audio_path,label_map,segment_length=segment_length)
-    # model ,scaler, methode= train_svm_model(audio_path,label_map,segment_length=segment_length)
+    # Gespeichertes Modell verwenden, falls Daten und Parameter übereinstimmen, sonst neu trainieren
+    model ,methode= train_or_load_svm_model(audio_path,"Optuna",label_map,segment_length,train_fn=train_svm_model_optuna)
+    # model ,methode= train_or_load_svm_model(audio_path,"RandomizeSearch",label_map,segment_length,train_fn=train_svm_model)
     test_files=[
         os.path.join(audio_path, "Linelle\LinelleNew16.wav"),
         os.path.join(audio_path, "Felix\Felix_17_2.wav"),
     ]
     
     for file in test_files:
+        # Datei nur einmal dekodieren, alle Schritte lesen aus demselben Handle
+        audio = AudioHandle(file)
         # Sprechererkennung mit Glättung durchführen
-        transcript = segment_and_analyze_with_svm(file, model, scaler,label_map, segment_length=0.25, sr=16000)
-        plot_speaker_timeline(transcript, methode,file)
-        plot_speaker_Gantt(transcript, methode,file)
+        transcript = segment_and_analyze_with_svm(audio, model,label_map, segment_length=0.25, sr=16000)
+        plot_speaker_timeline(transcript, methode,audio)
+        plot_speaker_Gantt(transcript, methode,audio)
 
-        #process_mp3_file(file, model,scaler)
+        #process_mp3_file(file, model)
         print()
         
-    live_audio_analysis_svm(model, scaler, label_map, segment_length=segment_length, sr=16000, window_size=3)
\ No newline at end of file
+    live_audio_analysis_svm(model, label_map, segment_length=segment_length, sr=16000, window_size=3)
\ No newline at end of file
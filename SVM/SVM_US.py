@@ -1,20 +1,26 @@
 import os
 from SVM_shared_utils import(
     train_svm_model_optuna,
+    train_or_load_svm_model,
+    AudioHandle,
     segment_and_analyze_with_svm,
     plot_speaker_timeline,
     live_audio_analysis_svm,
     train_svm_model,
     plot_speaker_Gantt,
-    audio_to_text
+    audio_to_text,
+    diagnose_svm_model
 )
 
 if __name__ == "__main__":
     audio_path = os.path.join(os.path.dirname(__file__), "..", "US-Wahlkampf") 
     label_map = {"Biden": 0, "Moderator": 1, "Trump": 2}
     segment_length=0.5
-    model ,scaler,methode= train_svm_model_optuna(audio_path,"Optuna",label_map,segment_length=segment_length)
-    # model ,scaler,methode= train_svm_model(audio_path,"RandomizeSearch",label_map,segment_length=segment_length)
+    # Gespeichertes Modell verwenden, falls Daten und Parameter übereinstimmen, sonst neu trainieren
+    model ,methode= train_or_load_svm_model(audio_path,"Optuna",label_map,segment_length,train_fn=train_svm_model_optuna)
+    # model ,methode= train_or_load_svm_model(audio_path,"RandomizeSearch",label_map,segment_length,train_fn=train_svm_model)
+    # Bewertung (Confusion-Matrix, Lernkurve) als eigene Stufe, Diagramme landen in SVM/Ausgaben
+    # diagnose_svm_model(model, audio_path, methode, label_map, segment_length)
     
     test_files=[
         os.path.join(audio_path, "15-17.mp3"),
@@ -22,13 +28,15 @@ if __name__ == "__main__":
        ] 
     
     for file in test_files:
-        #predict_speaker(model, file, scaler)
+        #predict_speaker(model, file)
+        # Datei nur einmal dekodieren, alle Schritte lesen aus demselben Handle
+        audio = AudioHandle(file)
         # Sprechererkennung mit Glättung durchführen
-        transcript = segment_and_analyze_with_svm(file, model, scaler,label_map, segment_length=0.25, sr=16000)
-        #plot_speaker_timeline(transcript,methode, file)
-        plot_speaker_Gantt(transcript, methode,file)
-        audio_to_text(file,transcript,"en-US")
+        transcript = segment_and_analyze_with_svm(audio, model,label_map, segment_length=0.25, sr=16000)
+        #plot_speaker_timeline(transcript,methode, audio)
+        plot_speaker_Gantt(transcript, methode,audio)
+        audio_to_text(audio,transcript,"en-US")
 
         print()
         
-    # live_audio_analysis_svm(model, scaler, label_map, segment_length=segment_length, sr=16000, window_size=3)
\ No newline at end of file
+    # live_audio_analysis_svm(model, label_map, segment_length=segment_length, sr=16000, window_size=3)
\ No newline at end of file
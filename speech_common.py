@@ -0,0 +1,671 @@
+"""
+Gemeinsame Hilfsfunktionen der SVM- und der CNN-Sprechererkennung (SVM/SVM_shared_utils.py und
+CNN/shared_speech_utils.py importieren sie von hier und reichen sie weiter): Dekodieren und Fenstern
+von Audio, Feature-Cache, Optuna-Studien, Batch-Vorhersage, Glättung, Viterbi und Live-Eingabe.
+"""
+import os
+import time
+import glob
+import json
+import hashlib
+import threading
+from collections import deque, Counter
+import numpy as np
+import librosa
+import soundfile as sf
+import soxr
+import audioread
+import optuna
+from scipy.ndimage import median_filter
+
+# Audio dekodieren und in Fenster schneiden
+def decode_audio_blocks(audio_file, block_seconds=10):
+    """
+    Öffnet eine Audiodatei zum blockweisen Dekodieren in der Original-Sampling-Rate (Mono, float32).
+
+    Rückgabe:
+    - Tuple[int, Generator]: Sampling-Rate der Datei und Generator über die Blöcke
+    """
+    try:
+        source = sf.SoundFile(audio_file)
+        native_sr = source.samplerate
+
+        def decode():
+            with source:
+                for block in source.blocks(blocksize=int(block_seconds * native_sr), dtype="float32", always_2d=True):
+                    yield block.mean(axis=1)
+    except RuntimeError:
+        source = audioread.audio_open(audio_file)
+        native_sr = source.samplerate
+
+        def decode():
+            # audioread liefert int16-PCM (verschachtelte Kanäle) in kleinen Puffern beliebiger Länge
+            frame_bytes = 2 * source.channels
+            block_bytes = int(block_seconds * native_sr) * frame_bytes
+            pending = bytearray()
+            with source:
+                for buffer in source:
+                    pending += buffer
+                    if len(pending) >= block_bytes:
+                        usable = len(pending) - len(pending) % frame_bytes
+                        yield _pcm16_to_mono(pending[:usable], source.channels)
+                        del pending[:usable]
+                usable = len(pending) - len(pending) % frame_bytes
+                if usable:
+                    yield _pcm16_to_mono(pending[:usable], source.channels)
+
+    return native_sr, decode()
+
+def resample_blocks(blocks, from_sr, to_sr):
+    """
+    Resampelt einen Strom von Audioblöcken mit `soxr.ResampleStream` (Qualität wie librosa, "soxr_hq").
+    """
+    if from_sr == to_sr:
+        yield from blocks
+        return
+
+    resampler = soxr.ResampleStream(from_sr, to_sr, 1, dtype="float32", quality="HQ")
+    for block in blocks:
+        yield resampler.resample_chunk(block)
+    yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+def _pcm16_to_mono(buffer, channels):
+    samples = np.frombuffer(bytes(buffer), dtype="<i2").astype(np.float32) / 32768.0
+    return samples.reshape(-1, channels).mean(axis=1)
+
+def stream_audio(audio_file, sr=22050, block_seconds=10):
+    """
+    Dekodiert eine Audiodatei blockweise, mischt sie auf Mono und resampelt sie auf `sr`.
+
+    Im Gegensatz zu `librosa.load` liegt nie die ganze Datei im Speicher: soundfile liest die Blöcke
+    (audioread als Fallback für Formate, die libsndfile nicht kennt), `soxr.ResampleStream` resampelt
+    mit derselben Qualität wie librosa ("soxr_hq") und trägt seinen Zustand über die Blockgrenzen.
+
+    Parameter:
+    - audio_file (str): Pfad zur Audiodatei
+    - sr (int): Ziel-Sampling-Rate
+    - block_seconds (float): Länge eines dekodierten Blocks in Sekunden
+
+    Rückgabe:
+    - Generator über float32-Blöcke (Mono, Sampling-Rate `sr`).
+    """
+    native_sr, blocks = decode_audio_blocks(audio_file, block_seconds)
+    yield from resample_blocks(blocks, native_sr, sr)
+
+def stream_windows(chunks, window, hop):
+    """
+    Schneidet aus einem Strom von Arrays überlappende Fenster entlang der letzten Achse
+    (Audio-Samples oder MFCC-Frames). Der Überlapp wird über die Chunk-Grenzen getragen,
+    es werden nur unvollständige Fenster am Ende verworfen.
+
+    Parameter:
+    - chunks: Iterierbare Folge von Arrays, die entlang der letzten Achse aneinandergehören.
+    - window (int): Fensterlänge.
+    - hop (int): Schrittweite zwischen zwei Fenstern.
+
+    Rückgabe:
+    - Generator über die Fenster (Views, die nicht mehr verändert werden).
+    """
+    buffer = None
+    for chunk in chunks:
+        buffer = chunk if buffer is None else np.concatenate([buffer, chunk], axis=-1)
+        start = 0
+        while start + window <= buffer.shape[-1]:
+            yield buffer[..., start:start + window]
+            start += hop
+        # Nur den noch benötigten Rest behalten (neues Array, ausgegebene Views bleiben gültig)
+        buffer = buffer[..., start:]
+
+# Feature-Cache
+def file_hash(file_path, chunk_size=1 << 20):
+    """
+    Berechnet einen SHA1-Hash über den Inhalt einer Datei (unabhängig von Name und Pfad).
+    """
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def feature_cache_paths(file_path, params, cache_dir):
+    """
+    Pfade (`.npy`, `.json`) des Cache-Eintrags einer Audiodatei für die gegebenen Feature-Parameter.
+    """
+    key_source = file_hash(file_path) + json.dumps(params, sort_keys=True)
+    key = hashlib.sha1(key_source.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key + ".npy"), os.path.join(cache_dir, key + ".json")
+
+def load_or_compute_features(file_path, params, compute_fn, cache_dir, max_cache_mb=2048, keep=()):
+    """
+    Inhaltsadressierter Feature-Cache: Merkmale einer Audiodatei werden einmal berechnet und als
+    `.npy`-Datei abgelegt. Der Schlüssel besteht aus dem Datei-Hash und allen Feature-Parametern.
+
+    Parameter:
+    - file_path (str): Pfad zur Audiodatei
+    - params (dict): Alle Parameter, die die Merkmale beeinflussen (JSON-serialisierbar)
+    - compute_fn: Funktion ohne Argumente, die (features, meta) liefert; meta ist ein dict
+    - cache_dir (str): Cache-Ordner (z. B. FEATURE_CACHE_DIR des Moduls); None schaltet den Cache ab
+    - max_cache_mb (float): Maximale Größe des Caches, älteste Einträge werden zuerst gelöscht
+    - keep: `.npy`-Pfade, die beim Verdrängen nicht gelöscht werden (z. B. die Shards des laufenden Trainings);
+      der gerade geschriebene Eintrag bleibt immer erhalten
+
+    Rückgabe:
+    - Tuple[np.ndarray, dict]: Merkmale (bei einem Cache-Treffer als read-only Memory-Map) und meta
+    """
+    if cache_dir is None:
+        return compute_fn()
+
+    features_path, meta_path = feature_cache_paths(file_path, params, cache_dir)
+
+    if os.path.exists(features_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            features = np.load(features_path, mmap_mode="r")
+            os.utime(features_path)  # Zuletzt benutzt -> wird später verdrängt
+            return features, meta
+        except (OSError, ValueError):
+            pass  # Beschädigter Eintrag -> neu berechnen
+
+    features, meta = compute_fn()
+    features = np.asarray(features, dtype=np.float32)
+
+    # Atomar schreiben, damit parallele Prozesse nie eine halbe Datei lesen
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_suffix = f".{os.getpid()}.tmp"
+    with open(features_path + tmp_suffix, 'wb') as f:
+        np.save(f, features)
+    with open(meta_path + tmp_suffix, 'w') as f:
+        json.dump(meta, f)
+    os.replace(features_path + tmp_suffix, features_path)
+    os.replace(meta_path + tmp_suffix, meta_path)
+
+    evict_feature_cache(cache_dir, max_cache_mb, keep=set(keep) | {features_path})
+    return features, meta
+
+def evict_feature_cache(cache_dir, max_cache_mb=2048, suffix=".npy", keep=()):
+    """
+    Löscht die am längsten nicht benutzten Einträge, bis der Cache kleiner als `max_cache_mb` ist.
+    `suffix` ist die Endung der Datendateien (".npy" für Merkmale, ".pcm" für `AudioHandle` der SVM),
+    Einträge, deren Datendatei in `keep` steht (z. B. der gerade geschriebene), bleiben erhalten.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(suffix):
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_cache_mb * 1024 ** 2:
+            break
+        if os.path.join(cache_dir, name) in keep:
+            continue
+        for file_path in (os.path.join(cache_dir, name), os.path.join(cache_dir, name[:-len(suffix)] + ".json")):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass  # Bereits von einem anderen Prozess gelöscht
+        total -= size
+
+# Fingerabdruck der Trainingsdaten (für Registry- und Studienschlüssel)
+def dataset_fingerprint(path, label_map):
+    """
+    Berechnet einen Fingerabdruck des Trainingsdatensatzes aus Sprecher, Dateiname und Dateiinhalt.
+    Ändert sich eine Datei oder kommt eine hinzu, ändert sich der Fingerabdruck.
+    """
+    digest = hashlib.sha1()
+    for speaker in sorted(label_map.keys()):
+        speaker_path = os.path.join(path, speaker)
+        if not os.path.exists(speaker_path):
+            continue
+        for file in sorted(os.listdir(speaker_path)):
+            if file.endswith(".mp3") or file.endswith(".wav"):
+                digest.update(f"{speaker}/{file}:{file_hash(os.path.join(speaker_path, file))};".encode("utf-8"))
+    return digest.hexdigest()
+
+# Optuna-Studien (gemeinsamer Storage, siehe run_study in beiden Modulen)
+def study_storage(study_dir):
+    """
+    Optuna-Storage als Journal-Datei in `study_dir`. Geschrieben wird mit Datei-Locks, mehrere Prozesse
+    können also gleichzeitig an derselben Studie arbeiten.
+    """
+    os.makedirs(study_dir, exist_ok=True)
+    return optuna.storages.JournalStorage(optuna.storages.journal.JournalFileBackend(os.path.join(study_dir, "studies.log")))
+
+def study_key(prefix, **params):
+    """
+    Name einer Studie aus Präfix und allen Parametern, die Daten und Suchraum bestimmen. Ändert sich
+    etwas davon, beginnt eine neue Studie, statt alte Trials mit anderen Daten fortzusetzen.
+    """
+    return prefix + "-" + hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def load_or_create_study(study_name, study_dir, pruner=None, initial_params=None):
+    """
+    Lädt die gespeicherte Studie `study_name` oder legt sie an. `initial_params` werden nur bei einer
+    neuen Studie als erster Trial eingereiht.
+    """
+    study = optuna.create_study(study_name=study_name, storage=study_storage(study_dir), direction="maximize",
+                                pruner=pruner, load_if_exists=True)
+    if initial_params is not None and not study.trials:
+        study.enqueue_trial(initial_params)
+    return study
+
+def _finished_trials(study):
+    return len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)))
+
+def _optimize_stored_study(study_name, study_dir, objective_fn, n_trials, remaining, n_jobs, pruner):
+    # Läuft ggf. in einem eigenen Prozess: Studie über den Namen aus dem gemeinsamen Storage laden
+    study = optuna.load_study(study_name=study_name, storage=study_storage(study_dir), pruner=pruner)
+    finished_states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    study.optimize(objective_fn, n_trials=remaining, n_jobs=n_jobs,
+                   callbacks=[optuna.study.MaxTrialsCallback(n_trials, states=finished_states)])
+
+# Vorhersagen in Batches
+def iter_prediction_batches(predict_fn, features, batch_size=256, max_batch_mb=64):
+    """
+    Sammelt Segment-Merkmale in Batches fester Größe und ruft die Vorhersage einmal pro Batch auf.
+    Die Vorhersagen werden pro Batch geliefert, sobald sie vorliegen (z. B. während die Datei noch dekodiert wird).
+
+    Parameter:
+    - predict_fn: Funktion, die ein Array (Batch, ...) auf Vorhersagen (Batch, ...) abbildet,
+      z. B. `model.predict_on_batch` (CNN) oder `model.predict` (SVM)
+    - features: Iterierbare Folge von Merkmalsarrays gleicher Form (Liste, Generator oder Array)
+    - batch_size (int): Maximale Anzahl Segmente pro Batch
+    - max_batch_mb (float): Speichergrenze für einen Batch in MB; verkleinert ggf. die Batch-Größe
+
+    Rückgabe:
+    - Generator über die Vorhersagen je Batch in der Reihenfolge der Eingabe
+    """
+    buffer = None
+    n = 0
+
+    for feature in features:
+        if buffer is None:
+            # Batch-Puffer einmal anlegen, Größe durch die Speichergrenze begrenzt
+            feature = np.asarray(feature)
+            rows_by_memory = int(max_batch_mb * 1024 ** 2 // max(feature.nbytes, 1))
+            buffer = np.empty((max(1, min(batch_size, rows_by_memory)),) + feature.shape, dtype=feature.dtype)
+
+        buffer[n] = feature
+        n += 1
+        if n == len(buffer):
+            yield np.asarray(predict_fn(buffer))
+            n = 0
+
+    if n > 0:
+        yield np.asarray(predict_fn(buffer[:n]))
+
+def predict_in_batches(predict_fn, features, batch_size=256, max_batch_mb=64):
+    """
+    Wie `iter_prediction_batches`, gibt aber alle Vorhersagen aneinandergehängt zurück.
+
+    Rückgabe:
+    - np.ndarray: Aneinandergehängte Vorhersagen in der Reihenfolge der Eingabe
+    """
+    results = list(iter_prediction_batches(predict_fn, features, batch_size, max_batch_mb))
+    if not results:
+        return np.empty(0, dtype=int)
+    return np.concatenate(results)
+
+# Glättung der Segment-Labels
+def _window_sums(values, window_size):
+    """
+    Summiert `values` (T, K) über ein zentriertes Fenster, das an den Rändern abgeschnitten wird.
+    Das Fenster von Segment i umfasst i - (window_size - 1) // 2 bis i + window_size // 2, genau
+    `window_size` Segmente (bei geraden Größen eines mehr nach hinten, wie bei `OnlineMajoritySmoother`).
+    Über kumulierte Summen in O(T * K), ohne Python-Schleife.
+    """
+    cumulative = np.concatenate([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+    index = np.arange(len(values))
+    upper = np.minimum(index + window_size // 2 + 1, len(values))
+    lower = np.maximum(index - (window_size - 1) // 2, 0)
+    return cumulative[upper] - cumulative[lower]
+
+def smooth_labels(labels, window_size=3, method="majority", num_classes=None):
+    """
+    Glättet eine Folge von Klassen-Labels vektorisiert.
+
+    Parameter:
+    - labels (np.ndarray): Vorhergesagte Labels pro Segment
+    - window_size (int): Größe des zentrierten Fensters (an den Rändern abgeschnitten)
+    - method (str): "majority" (Mehrheitsentscheid, bei Gleichstand das kleinste Label) oder
+      "median" (Medianfilter, nur bei geordneten Labels bzw. zwei Sprechern sinnvoll)
+    - num_classes (int): Anzahl Klassen (Standard: größtes Label + 1)
+
+    Rückgabe:
+    - np.ndarray: Geglättete Labels
+    """
+    labels = np.asarray(labels, dtype=int)
+    if len(labels) == 0 or window_size <= 1:
+        return labels.copy()
+
+    if method == "median":
+        return median_filter(labels, size=window_size, mode="nearest")
+    if method != "majority":
+        raise ValueError(f"Unbekannte Glättungsmethode: {method}")
+
+    if num_classes is None:
+        num_classes = labels.max() + 1
+    one_hot = np.zeros((len(labels), num_classes))
+    one_hot[np.arange(len(labels)), labels] = 1
+    return np.argmax(_window_sums(one_hot, window_size), axis=1)
+
+def smooth_probabilities(probabilities, window_size=3):
+    """
+    Mittelt Klassenwahrscheinlichkeiten (T, K) über ein zentriertes Fenster und gibt pro Segment
+    den Index der wahrscheinlichsten Klasse zurück.
+
+    Parameter:
+    - probabilities (np.ndarray): z. B. Ausgabe von `predict_proba` oder der Softmax-Schicht
+    - window_size (int): Größe des zentrierten Fensters (an den Rändern abgeschnitten)
+
+    Rückgabe:
+    - np.ndarray: Spaltenindex der Klasse mit der höchsten mittleren Wahrscheinlichkeit
+    """
+    probabilities = np.asarray(probabilities, dtype=float)
+    if len(probabilities) == 0:
+        return np.empty(0, dtype=int)
+    return np.argmax(_window_sums(probabilities, window_size), axis=1)
+
+class OnlineMajoritySmoother:
+    """
+    Inkrementelle Mehrheitsglättung für die Live-Erkennung.
+
+    Es werden nur die letzten `window_size` Labels und deren Häufigkeiten gehalten, jedes neue
+    Segment kostet O(window_size) statt einer Neuberechnung über die gesamte bisherige Sitzung.
+    Das geglättete Label gehört zum mittleren Segment des Fensters (bei geraden Größen zum vorderen
+    der beiden mittleren), die Ausgabe ist also um window_size // 2 Segmente verzögert. Die Fenster sind
+    dieselben wie bei `smooth_labels`. Bei Gleichstand gewinnt das kleinste Label.
+    """
+
+    def __init__(self, window_size=3):
+        self.window_size = window_size
+        self.before = (window_size - 1) // 2  # Segmente vor dem geglätteten Segment
+        self.lag = window_size // 2  # Segmente danach = Verzögerung der Ausgabe
+        self.window = deque(maxlen=window_size)
+        self.counts = Counter()
+        self.count = 0  # Anzahl bisher eingegangener Segmente
+
+    def _majority(self):
+        best = max(self.counts.values())
+        return min(label for label, n in self.counts.items() if n == best)
+
+    def push(self, label):
+        """
+        Nimmt das Label eines neuen Segments auf.
+
+        Rückgabe:
+        - (index, label) des nun geglätteten Segments oder None, solange das Fenster noch nicht reicht.
+        """
+        if len(self.window) == self.window_size:
+            old = self.window[0]
+            self.counts[old] -= 1
+            if self.counts[old] == 0:
+                del self.counts[old]
+        self.window.append(label)
+        self.counts[label] += 1
+        self.count += 1
+
+        index = self.count - 1 - self.lag
+        if index < 0:
+            return None
+        return index, self._majority()
+
+    def flush(self):
+        """
+        Liefert die geglätteten Labels der letzten Segmente, deren Fenster am Ende abgeschnitten ist.
+        """
+        results = []
+        for index in range(max(self.count - self.lag, 0), self.count):
+            # Fenster um das Segment `index`, soweit Segmente vorhanden sind
+            first = max(index - self.before, self.count - len(self.window))
+            labels = list(self.window)[first - (self.count - len(self.window)):]
+            counts = Counter(labels)
+            best = max(counts.values())
+            results.append((index, min(label for label, n in counts.items() if n == best)))
+        return results
+
+# Viterbi-Dekodierung
+def switch_transition_matrix(num_classes, switch_prob=0.1):
+    """
+    Übergangsmatrix, die mit Wahrscheinlichkeit 1 - switch_prob beim aktuellen Sprecher bleibt
+    und sonst gleichverteilt zu einem der anderen Sprecher wechselt.
+    """
+    if num_classes == 1:
+        return np.ones((1, 1))
+    transmat = np.full((num_classes, num_classes), switch_prob / (num_classes - 1))
+    np.fill_diagonal(transmat, 1.0 - switch_prob)
+    return transmat
+
+def labels_to_posteriors(labels, num_classes, confidence=0.9):
+    """
+    Wandelt harte Labels in Pseudo-Wahrscheinlichkeiten um, z. B. für Modelle ohne `predict_proba`.
+    Das vorhergesagte Label erhält `confidence`, der Rest wird auf die übrigen Klassen verteilt.
+    """
+    labels = np.asarray(labels, dtype=int)
+    if num_classes == 1:
+        return np.ones((len(labels), 1))
+    posteriors = np.full((len(labels), num_classes), (1.0 - confidence) / (num_classes - 1))
+    posteriors[np.arange(len(labels)), labels] = confidence
+    return posteriors
+
+def _log(values):
+    with np.errstate(divide="ignore"):
+        return np.log(values)
+
+def _viterbi_step(score, log_transmat, log_emission):
+    """Ein Viterbi-Schritt: beste Vorgänger (Backpointer) und neue Pfadbewertung, vektorisiert über alle Zustände."""
+    candidates = score[:, None] + log_transmat  # candidates[i, j]: Pfad über Zustand i nach j
+    backpointer = np.argmax(candidates, axis=0)
+    return backpointer, candidates[backpointer, np.arange(len(score))] + log_emission
+
+def viterbi_decode(posteriors, switch_prob=0.1, transmat=None, startprob=None):
+    """
+    Bestimmt die wahrscheinlichste Sprecherfolge aus Klassenwahrscheinlichkeiten pro Segment (Viterbi im Log-Raum).
+
+    Die Wahrscheinlichkeiten des Klassifikators (`predict_proba` bzw. Softmax) dienen direkt als Emissionen,
+    es wird kein Modell angepasst. Laufzeit O(T * K²) für T Segmente und K Sprecher.
+
+    Parameter:
+    - posteriors (np.ndarray): Wahrscheinlichkeiten (T, K), Spalte = Label
+    - switch_prob (float): Wahrscheinlichkeit eines Sprecherwechsels zwischen zwei Segmenten
+    - transmat (np.ndarray): Optionale Übergangsmatrix (K, K), ersetzt switch_prob
+    - startprob (np.ndarray): Optionale Startwahrscheinlichkeiten (Standard: gleichverteilt)
+
+    Rückgabe:
+    - np.ndarray: Geglättete Labels
+    """
+    posteriors = np.asarray(posteriors, dtype=float)
+    if len(posteriors) == 0:
+        return np.empty(0, dtype=int)
+
+    num_segments, num_classes = posteriors.shape
+    log_transmat = _log(switch_transition_matrix(num_classes, switch_prob) if transmat is None else np.asarray(transmat))
+    log_start = _log(np.full(num_classes, 1.0 / num_classes) if startprob is None else np.asarray(startprob))
+    log_emissions = _log(posteriors)
+
+    backpointers = np.empty((num_segments, num_classes), dtype=int)
+    score = log_start + log_emissions[0]
+    for t in range(1, num_segments):
+        backpointers[t], score = _viterbi_step(score, log_transmat, log_emissions[t])
+
+    # Rückverfolgung des besten Pfads
+    path = np.empty(num_segments, dtype=int)
+    path[-1] = np.argmax(score)
+    for t in range(num_segments - 1, 0, -1):
+        path[t - 1] = backpointers[t, path[t]]
+    return path
+
+class StreamingViterbi:
+    """
+    Viterbi-Glättung mit fester Verzögerung (fixed lag) für die Live-Erkennung.
+
+    Pro Segment wird ein Viterbi-Schritt gerechnet; das Label eines Segments wird festgelegt, sobald
+    `lag` weitere Segmente eingegangen sind. Es werden nur die letzten `lag` Backpointer gehalten,
+    Speicher und Aufwand pro Segment sind also unabhängig von der Länge der Sitzung.
+    Schnittstelle wie `OnlineMajoritySmoother`, aber `push` erwartet Wahrscheinlichkeiten statt eines Labels.
+    """
+
+    def __init__(self, num_classes, lag=5, switch_prob=0.1, transmat=None, startprob=None):
+        self.lag = lag
+        self.log_transmat = _log(switch_transition_matrix(num_classes, switch_prob) if transmat is None else np.asarray(transmat))
+        self.log_start = _log(np.full(num_classes, 1.0 / num_classes) if startprob is None else np.asarray(startprob))
+        self.backpointers = deque(maxlen=lag)
+        self.score = None
+        self.count = 0  # Anzahl bisher eingegangener Segmente
+
+    def _traceback(self):
+        """Bester Pfad über die gehaltenen Segmente (das letzte Element gehört zum neuesten Segment)."""
+        state = int(np.argmax(self.score))
+        path = [state]
+        for backpointer in reversed(self.backpointers):
+            state = int(backpointer[state])
+            path.append(state)
+        return path[::-1]
+
+    def push(self, posterior):
+        """
+        Nimmt die Klassenwahrscheinlichkeiten eines neuen Segments auf.
+
+        Rückgabe:
+        - (index, label) des nun festgelegten Segments oder None, solange noch keine `lag` Segmente folgen.
+        """
+        log_emission = _log(np.asarray(posterior, dtype=float))
+        if self.score is None:
+            self.score = self.log_start + log_emission
+        else:
+            backpointer, self.score = _viterbi_step(self.score, self.log_transmat, log_emission)
+            if self.lag > 0:
+                self.backpointers.append(backpointer)
+        self.score = self.score - np.max(self.score)  # Normieren, damit die Werte nicht unbegrenzt fallen
+        self.count += 1
+
+        index = self.count - 1 - self.lag
+        if index < 0:
+            return None
+        return index, self._traceback()[0]
+
+    def flush(self):
+        """
+        Liefert die Labels der letzten, noch nicht festgelegten Segmente.
+        """
+        if self.score is None:
+            return []
+        path = self._traceback()
+        first = self.count - len(path)
+        return [(first + i, label) for i, label in enumerate(path) if first + i >= self.count - self.lag]
+
+# Live-Eingabe
+class AudioRingBuffer:
+    """
+    Vorab angelegter float32-Ringpuffer für die Live-Erkennung.
+
+    Der Audio-Callback schreibt (ein Produzent), die Analyse-Schleife liest Segmente fester Länge
+    (ein Konsument). Schreib- und Leseposition werden jeweils nur von einer Seite verändert, daher
+    ist kein Lock nötig. Der Speicher bleibt konstant, pro Block wird nichts neu angelegt.
+    """
+
+    def __init__(self, capacity):
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self.write_pos = 0  # Anzahl insgesamt geschriebener Samples (nur der Produzent ändert sie)
+        self.read_pos = 0   # Anzahl insgesamt gelesener Samples (nur der Konsument ändert sie)
+        self.dropped = 0    # Samples, die wegen eines vollen Puffers verworfen wurden
+
+    def available(self):
+        """Anzahl der Samples, die gelesen werden können."""
+        return self.write_pos - self.read_pos
+
+    def write(self, block):
+        """Kopiert einen Audioblock in den Puffer; bei vollem Puffer wird der Überschuss verworfen."""
+        n = len(block)
+        free = self.capacity - self.available()
+        if n > free:
+            self.dropped += n - free
+            n = free
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = block[:first]
+        self.buffer[:n - first] = block[first:n]
+        self.write_pos += n  # Erst nach dem Kopieren freigeben
+
+    def read_into(self, out):
+        """Füllt `out` mit den nächsten len(out) Samples. Gibt False zurück, wenn noch nicht genug Daten da sind."""
+        n = len(out)
+        if self.available() < n:
+            return False
+        start = self.read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:] = self.buffer[:n - first]
+        self.read_pos += n
+        return True
+
+class FileInputStream:
+    """
+    Ersatz für `sd.InputStream`, der eine Audiodatei blockweise an den Callback liefert.
+    Damit lässt sich die Live-Erkennung ohne Mikrofon testen, z. B.:
+    `live_audio_analysis(..., input_stream=functools.partial(FileInputStream, "datei.wav"))` (CNN) bzw. `live_audio_analysis_svm`
+    Mit `realtime=False` werden die Blöcke ohne Pause geliefert; der Ringpuffer muss dann die ganze Datei fassen.
+    """
+
+    def __init__(self, audio_file, samplerate, channels=1, callback=None, blocksize=1024, realtime=True, **kwargs):
+        self.audio, _ = librosa.load(audio_file, sr=samplerate)
+        self.samplerate = samplerate
+        self.callback = callback
+        self.blocksize = blocksize
+        self.realtime = realtime
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def active(self):
+        return not self.finished.is_set()
+
+    def _run(self):
+        block = np.zeros((self.blocksize, 1), dtype=np.float32)
+        for start in range(0, len(self.audio), self.blocksize):
+            if self.finished.is_set():
+                break
+            frames = min(self.blocksize, len(self.audio) - start)
+            block[:frames, 0] = self.audio[start:start + frames]
+            self.callback(block[:frames], frames, None, None)
+            if self.realtime:
+                time.sleep(frames / self.samplerate)
+        self.finished.set()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.finished.set()
+        self.thread.join()
+
+# Stapelverarbeitung
+def write_text_atomic(path, text):
+    """
+    Schreibt eine Textdatei atomar (temporäre Datei + os.replace), Leser sehen nie eine halb geschriebene Datei.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(tmp_path, path)
+
+def resolve_audio_files(inputs):
+    """
+    Löst Ordner, Glob-Muster oder Listen davon in eine sortierte Liste von Audiodateien (.wav, .mp3) auf.
+    """
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    files = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            files.extend(os.path.join(entry, file) for file in os.listdir(entry) if file.endswith(".wav") or file.endswith(".mp3"))
+        else:
+            files.extend(glob.glob(entry))
+    return sorted(set(files))